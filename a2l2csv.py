@@ -1,104 +1,19 @@
 import sys
 import os
 import argparse
-import lib.Constants as Constants
-from lib.Constants import DBType
-from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, QListWidget, QTabWidget
-from pya2l import DB
-from lib.UI.TABDatabase import TABDatabase
-from lib.UI.TABSearch import TABSearch
-from lib.UI.TABList import TABList
-
-
-class MainWindow(QMainWindow):
-    def __init__(self, db_file=None, csv_file=None):
-        super().__init__()
-
-        #Variables used to hold database
-        self.db_type        = DBType.NONE
-        self.a2ldb          = DB()
-        self.a2lsession     = None
-        self.csv_name_db    = {}
-        self.csv_desc_db    = {}
-        self.csv_address_db = {}
-
-        # Store CSV file to load after A2L is loaded
-        self.pending_csv_file = csv_file 
-
-        #set title
-        self.setWindowTitle(Constants.APPLICATION_VERSION_STRING)
-
-        #tabs
-        self.listTab = TABList(self)
-        self.dbTab = TABDatabase(self)
-
-        self.tabs = QTabWidget()
-        self.tabs.addTab(self.dbTab, "Database")
-        self.tabs.addTab(TABSearch(self), "Search")
-        self.tabs.addTab(self.listTab, "List")
-
-        #log box
-        self.listViewLog = QListWidget()
-        self.listViewLog.setFixedHeight(100)
-        layoutLog = QVBoxLayout()
-        layoutLog.addWidget(self.listViewLog)
-
-        layoutBoxAll = QVBoxLayout()
-        layoutBoxAll.addWidget(self.tabs)
-        layoutBoxAll.addLayout(layoutLog)
-
-        widget = QWidget()
-        widget.setLayout(layoutBoxAll)
-        self.setGeometry(300, 300, 650, 600)
-        self.setCentralWidget(widget)
-        self.show()
-
-        # If db_file was provided, load it automatically
-        if db_file:
-            self.dbTab.fileEditBox.setText(db_file)
-            self.dbTab.LoadButtonClick()
-        elif csv_file:
-            # If only CSV provided without DB, load it immediately
-            self.listTab.ImportButtonClick(csvFilename=csv_file)
-            # Switch to List tab to show the imported data
-            self.tabs.setCurrentIndex(2)
-
-
-    def addLogEntry(self, entry):
-        self.listViewLog.addItem(entry)
-        self.listViewLog.scrollToBottom()
-
-
-    def addListItem(self, item, overwrite=False):
-        self.listTab.addListItem(item, overwrite)
-
-
-    def getListItem(self, row):
-        return self.listTab.getListItem(row)
-
-
-    def updateListItem(self, item, row):
-        self.listTab.updateListItem(item, row)
-
-
-    def checkForDuplicates(self):
-        self.listTab.checkForDuplicates()
-
-
-    def checkAndLoadPendingCSV(self):
-        """Check if DB is loaded and load pending CSV if present"""
-        if self.pending_csv_file and self.a2lsession:
-            # Use TABList's ImportButtonClick method with the filename
-            self.listTab.ImportButtonClick(csvFilename=self.pending_csv_file)
-            # Switch to List tab to show the imported data
-            self.tabs.setCurrentIndex(2)
-            self.pending_csv_file = None  # Clear after loading
+import multiprocessing
+import lib.CLI as CLI
 
 
 def print_usage():
     """Print usage information and exit."""
     print(f"""
 Usage: python a2l2csv.py [DB_FILE] [OPTIONS]
+       python a2l2csv.py export --db DB_FILE [--query TEXT ...] [--type name|desc|addr]
+                                [--position start|contain|end|eq] [--limit N] --out FILE
+       python a2l2csv.py precompile DIRECTORY [--recursive] [--workers N]
+       python a2l2csv.py refresh --db DB_FILE --list PID_LIST --out FILE
+       python a2l2csv.py diff OLD_DB NEW_DB --out REPORT [--map FILE]
 
 A2L to CSV converter application.
 
@@ -113,6 +28,16 @@ Options:
                         If provided alone, the CSV will be loaded immediately.
   -h, --help            Show this help message and exit.
 
+Commands (run without the GUI, Qt is not required):
+  export                Load DB_FILE, search it and write the matching measurements
+                        to a PID list CSV. Use 'export --help' for all options.
+  precompile            Build the databases of every .a2l in a directory across a
+                        process pool, so they open instantly in the application.
+  refresh               Rewrite the unit, equation, format, limits and description of
+                        every PID in a list from DB_FILE, joined by name.
+  diff                  Report the measurements added, removed or changed between two
+                        databases as CSV or JSON, with an optional address map.
+
 Examples:
   python a2l2csv.py                              # Start with empty tabs
   python a2l2csv.py myfile.a2l                   # Load A2L file automatically
@@ -120,6 +45,10 @@ Examples:
   python a2l2csv.py database.csv                 # Load CSV database automatically
   python a2l2csv.py myfile.a2l -p pids.csv       # Load A2L then import PID list
   python a2l2csv.py --pid-list pids.csv          # Import PID list only
+  python a2l2csv.py export --db myfile.a2l --query boost --out pids.csv
+  python a2l2csv.py precompile a2l_drop/ --recursive
+  python a2l2csv.py refresh --db new.a2l --list pids.csv --out pids.csv
+  python a2l2csv.py diff old.a2l new.a2l --out changes.csv --map moved.csv
 
 Supported file types:
   DB files: .a2l, .a2ldb or .csv
@@ -190,6 +119,13 @@ def validate_csv_file(filepath):
 
 # Main
 if __name__ == "__main__":
+    # In the frozen exe, worker processes re-run this script, this hands them to multiprocessing
+    multiprocessing.freeze_support()
+
+    # Headless commands run without importing Qt
+    if len(sys.argv) > 1 and sys.argv[1] in CLI.COMMANDS:
+        sys.exit(CLI.main(sys.argv[1:]))
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(add_help=False)  # Disable default help to use custom
     parser.add_argument('db_file', nargs='?', help='Optional .a2l, .a2ldb or .csv file to load')
@@ -207,6 +143,9 @@ if __name__ == "__main__":
     csv_file = validate_csv_file(args.csv_file) if args.csv_file else None
     
     # Start application
+    from PyQt6.QtWidgets import QApplication
+    from lib.UI.MainWindow import MainWindow
+
     app = QApplication(sys.argv)
     w = MainWindow(db_file=db_file, csv_file=csv_file)
     app.exec()
\ No newline at end of file
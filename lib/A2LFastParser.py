@@ -0,0 +1,205 @@
+import re
+
+
+#blocks read by the parser, everything else in the file is skipped unparsed
+BLOCK_PATTERN   = re.compile(r"/begin\s+(MEASUREMENT|COMPU_METHOD)\s(.*?)/end\s+\1\b", re.S)
+BEGIN_PATTERN   = re.compile(r"/begin\s+(MEASUREMENT|COMPU_METHOD)\s")
+
+#strings, comments and the text between them, read in one pass so /begin inside a comment is never taken for a block
+CLEAN_PATTERN   = re.compile(r'(?P<string>"(?:[^"\\]|\\.|"")*")|(?P<comment>/\*.*?\*/|//[^\n]*)|(?P<text>(?:[^"/]|/(?![*/]))+)', re.S)
+
+#quoted strings, comments and plain words of a block body
+TOKEN_PATTERN   = re.compile(r'"((?:[^"\\]|\\.|"")*)"|/\*.*?\*/|//[^\n]*|(\S+)', re.S)
+
+
+class A2LFastParser():
+    """
+    Streaming reader for the MEASUREMENT and COMPU_METHOD blocks of an A2L.
+    The file is read in chunks and only those blocks are tokenised, so a large
+    A2L is read in seconds instead of going through a full pya2l import.
+    Nested blocks such as IF_DATA are skipped, only the fields a2l2csv shows are kept.
+    """
+    CHUNK_SIZE      = 1 << 22
+    TAIL_SIZE       = 64        #enough to hold a '/begin MEASUREMENT' split across two chunks
+
+    def __init__(self, filename, encoding="latin-1"):
+        self.filename       = filename
+        self.encoding       = encoding
+        self.measurements   = []
+        self.compu_methods  = {}
+
+
+    def parse(self):
+        """
+        Read the file, measurements become (name, description, datatype, conversion, lower, upper, address)
+        tuples and compu_methods maps each name to (unit, format, coeffs), coeffs are all None without COEFFS
+        """
+        for block_type, body in self._blocks():
+            tokens = self._tokens(body)
+
+            if block_type == "MEASUREMENT":
+                measurement = self._measurement(tokens)
+                if measurement is not None:
+                    self.measurements.append(measurement)
+
+            else:
+                compu_method = self._compuMethod(tokens)
+                if compu_method is not None:
+                    self.compu_methods[compu_method[0]] = compu_method[1:]
+
+        return self.measurements, self.compu_methods
+
+
+    def _blocks(self):
+        carry = ""
+        for chunk in self._chunks():
+            buffer = carry + chunk
+
+            last_end = 0
+            for match in BLOCK_PATTERN.finditer(buffer):
+                yield match.group(1), match.group(2)
+                last_end = match.end()
+
+            #carry an unfinished block, or the tail that may hold the start of one, into the next chunk
+            begin = BEGIN_PATTERN.search(buffer, last_end)
+            carry = buffer[begin.start():] if begin is not None else buffer[max(last_end, len(buffer) - self.TAIL_SIZE):]
+
+
+    def _chunks(self):
+        """Yield the file in chunks with every comment outside a string replaced by a space"""
+        with open(self.filename, "r", encoding=self.encoding, newline="") as a2lfile:
+            carry = ""
+            while True:
+                chunk = a2lfile.read(self.CHUNK_SIZE)
+                buffer = carry + chunk
+
+                parts = []
+                position = 0
+                while position < len(buffer):
+                    match = CLEAN_PATTERN.match(buffer, position)
+
+                    #a string, comment or trailing / that may go on in the next chunk
+                    if match is None or (chunk and match.end() == len(buffer) and (match.lastgroup != "text" or buffer.endswith("/"))):
+                        break
+
+                    parts.append(" " if match.lastgroup == "comment" else match.group())
+                    position = match.end()
+
+                #at the end of the file an unclosed comment is dropped and an unclosed string kept as written
+                if not chunk:
+                    parts.append(" " if buffer.startswith("/*", position) else buffer[position:])
+                    yield "".join(parts)
+                    return
+
+                carry = buffer[position:]
+                yield "".join(parts)
+
+
+    def _tokens(self, body):
+        #strings are returned as (text,) tuples so a quoted keyword is never taken for a real one,
+        #their text is kept as written, escapes included, the same as pya2l stores it
+        tokens = []
+        for match in TOKEN_PATTERN.finditer(body):
+            string, word = match.groups()
+            if word is not None:
+                tokens.append(word)
+
+            elif string is not None:
+                tokens.append((string,))
+
+        return tokens
+
+
+    def _keywords(self, tokens, start):
+        """Yield (keyword, position) for the keywords outside nested blocks, from tokens[start:]"""
+        depth = 0
+        position = start
+        while position < len(tokens):
+            token = tokens[position]
+            if token == "/begin":
+                depth += 1
+                position += 1
+
+            elif token == "/end":
+                depth -= 1
+                position += 1
+
+            elif depth == 0 and isinstance(token, str):
+                yield token, position
+
+            position += 1
+
+
+    def _measurement(self, tokens):
+        #name "long identifier" datatype conversion resolution accuracy lower upper
+        if len(tokens) < 8:
+            return None
+
+        try:
+            name, description, datatype, conversion = self._text(tokens[0]), self._text(tokens[1]), tokens[2], tokens[3]
+            lower, upper = self._number(tokens[6]), self._number(tokens[7])
+
+        except (TypeError, ValueError):
+            return None
+
+        address = None
+        for keyword, position in self._keywords(tokens, 8):
+            if keyword == "ECU_ADDRESS" and position + 1 < len(tokens):
+                try:
+                    address = int(tokens[position + 1], 0)
+
+                except (TypeError, ValueError):
+                    address = None
+
+                break
+
+        return name, description, datatype, conversion, lower, upper, address
+
+
+    def _compuMethod(self, tokens):
+        #name "long identifier" conversion type "format" "unit"
+        if len(tokens) < 5:
+            return None
+
+        try:
+            name, compu_format, unit = self._text(tokens[0]), self._text(tokens[3]), self._text(tokens[4])
+
+        except TypeError:
+            return None
+
+        coeffs = (None, None, None, None, None, None)
+        for keyword, position in self._keywords(tokens, 5):
+            if keyword == "COEFFS" and position + 6 < len(tokens):
+                try:
+                    coeffs = tuple(self._number(token) for token in tokens[position + 1:position + 7])
+
+                except (TypeError, ValueError):
+                    pass
+
+                break
+
+        return name, unit, compu_format, coeffs
+
+
+    def _text(self, token):
+        #identifiers are words, descriptions, formats and units are strings
+        if isinstance(token, tuple):
+            return token[0]
+
+        if isinstance(token, str):
+            return token
+
+        raise TypeError(f"unexpected token {token}")
+
+
+    def _number(self, token):
+        if isinstance(token, tuple):
+            raise TypeError(f"expected a number, found string {token[0]}")
+
+        #adding 0.0 turns -0 into 0.0, as the built database stores it
+        try:
+            return float(token) + 0.0
+
+        except ValueError:
+            #hex values such as 0xFF
+            return float(int(token, 0))
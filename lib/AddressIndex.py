@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+#addresses are stored as unsigned 64 bit integers
+ADDRESS_LIMIT = 1 << 64
+
+
+class AddressIndex():
+    """
+    Sorted integer array of ECU addresses with parallel row references.
+    Built once at load time for both A2L and CSV databases, it answers
+    exact, >=, <= and [lo, hi] queries with a bisect range scan.
+    """
+    def __init__(self, entries):
+        #entries is an iterable of (address, ref) pairs
+        entries         = sorted(entries, key=lambda entry: entry[0])
+        self.addresses  = array("Q", [entry[0] for entry in entries])
+        self.refs       = [entry[1] for entry in entries]
+
+
+    def __len__(self):
+        return len(self.addresses)
+
+
+    def equals(self, address):
+        return self.between(address, address)
+
+
+    def atLeast(self, address):
+        return self.refs[bisect_left(self.addresses, address):]
+
+
+    def atMost(self, address):
+        return self.refs[:bisect_right(self.addresses, address)]
+
+
+    def between(self, lo, hi):
+        lo_index = bisect_left(self.addresses, lo)
+        hi_index = bisect_right(self.addresses, hi, lo_index)
+        return self.refs[lo_index:hi_index]
+
+
+"""
+Convert an address string such as 0x1234 or 0X00001234 to an integer,
+returns None if the string is not a valid hex address or wider than 64 bits
+"""
+def parseAddress(address):
+    try:
+        value = int(address.strip(), 16)
+    except (ValueError, AttributeError):
+        return None
+
+    return value if 0 <= value < ADDRESS_LIMIT else None
+
+
+"""
+Convert an address search string to an inclusive (lo, hi) range,
+either a single address or two addresses separated by '-',
+returns None if the string is invalid
+"""
+def parseAddressRange(search_string):
+    parts = search_string.split("-")
+    if len(parts) > 2:
+        return None
+
+    lo = parseAddress(parts[0])
+    hi = parseAddress(parts[-1])
+    if lo is None or hi is None:
+        return None
+
+    return (lo, hi) if lo <= hi else (hi, lo)
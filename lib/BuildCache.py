@@ -0,0 +1,336 @@
+import os
+import time
+import json
+import shutil
+import hashlib
+import threading
+import lib.Constants as Constants
+from importlib import metadata
+from pya2l import DB
+from lib.FullTextIndex import FullTextIndex
+from lib.IndexManager import IndexManager
+
+
+"""
+Version of the A2L parser, a new version gets its own cache entries
+"""
+def parserVersion():
+    try:
+        return metadata.version("pya2ldb")
+
+    except metadata.PackageNotFoundError:
+        import pya2l
+        return getattr(pya2l, "__version__", "unknown")
+
+
+"""
+Build the database of one A2L with its indexes, returns (filename, status, seconds, message).
+Runs in a worker process, for precompile and for the background build after a fast load
+"""
+def buildFile(filename):
+    start_time = time.time()
+    try:
+        if Constants.USE_BUILD_CACHE:
+            build_cache = BuildCache()
+            build_dir = build_cache.buildDir(filename)
+            if build_cache.cachedDatabase(build_dir) is not None:
+                return filename, "cached", time.time() - start_time, ""
+
+        #a second build of the same file would overwrite the database the first one is writing
+        build_lock = buildLock(filename)
+        if not build_lock.acquire():
+            return filename, "building", time.time() - start_time, "already being built by another process"
+
+        try:
+            if Constants.USE_BUILD_CACHE:
+                a2lsession = build_cache.build(filename, build_dir, progress_bar=False)
+
+            else:
+                a2lsession = DB().import_a2l(filename, encoding="latin-1", force_overwrite=True, progress_bar=False)
+
+            #store the indexes the app would otherwise add on first open
+            IndexManager(a2lsession).ensure()
+            if Constants.USE_FULL_TEXT_INDEX:
+                FullTextIndex(a2lsession).ensure()
+
+            a2lsession.close()
+
+        finally:
+            build_lock.release()
+
+        return filename, "built", time.time() - start_time, ""
+
+    except Exception as e:
+        return filename, "failed", time.time() - start_time, str(e)
+
+
+"""
+Check whether an A2L already has a built database, in the cache
+or as the .a2ldb pya2l writes beside it when the cache is disabled
+"""
+def hasBuild(filename):
+    if Constants.USE_BUILD_CACHE:
+        build_cache = BuildCache()
+        return build_cache.cachedDatabase(build_cache.buildDir(filename)) is not None
+
+    #pya2l creates the .a2ldb when the import starts, it is only usable once no build holds it
+    return os.path.isfile(f"{os.path.splitext(filename)[0]}.a2ldb") and not buildLock(filename).isHeld()
+
+
+"""
+Return the lock marking a running build of an A2L, in its cache entry
+or beside the .a2ldb when the cache is disabled
+"""
+def buildLock(filename):
+    if Constants.USE_BUILD_CACHE:
+        build_cache = BuildCache()
+        return BuildLock(os.path.join(build_cache.buildDir(filename), BuildCache.LOCK_FILENAME))
+
+    return BuildLock(f"{os.path.splitext(filename)[0]}.a2ldb.{BuildCache.LOCK_FILENAME}")
+
+
+class BuildLock():
+    """
+    In progress marker of a build, a file that only one process can create.
+    The owner touches it while the build runs, so the marker of a build that was
+    stopped with the application goes stale and is taken over by the next build.
+    """
+    STALE_SECONDS       = 30
+    HEARTBEAT_SECONDS   = 5
+
+    def __init__(self, lock_filename):
+        self.lock_filename  = lock_filename
+        self.heartbeat      = None
+        self.stopped        = threading.Event()
+
+
+    def isHeld(self):
+        """Return whether a build that is still alive holds the lock"""
+        try:
+            return time.time() - os.path.getmtime(self.lock_filename) < self.STALE_SECONDS
+
+        except OSError:
+            return False
+
+
+    def acquire(self):
+        """Take the lock, False when another build holds it"""
+        os.makedirs(os.path.dirname(self.lock_filename) or ".", exist_ok=True)
+
+        if os.path.exists(self.lock_filename) and not self.isHeld():
+            try:
+                os.remove(self.lock_filename)
+
+            except OSError:
+                pass
+
+        try:
+            os.close(os.open(self.lock_filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+
+        except FileExistsError:
+            return False
+
+        self.stopped.clear()
+        self.heartbeat = threading.Thread(target=self._touch, daemon=True)
+        self.heartbeat.start()
+        return True
+
+
+    def release(self):
+        self.stopped.set()
+        if self.heartbeat is not None:
+            self.heartbeat.join()
+            self.heartbeat = None
+
+        try:
+            os.remove(self.lock_filename)
+
+        except OSError:
+            pass
+
+
+    def _touch(self):
+        while not self.stopped.wait(self.HEARTBEAT_SECONDS):
+            try:
+                os.utime(self.lock_filename)
+
+            except OSError:
+                pass
+
+
+class BuildCache():
+    """
+    Cache of imported .a2ldb databases keyed by the A2L content hash and parser version.
+    Every copy of the same A2L opens the same database and an edited A2L is rebuilt.
+    The size and mtime of each path are remembered so unchanged files are not hashed again.
+    After each build the least recently used builds over BUILD_CACHE_MAX_BYTES are removed.
+    """
+    INDEX_FILENAME      = "index.json"
+    COMPLETE_FILENAME   = "complete"
+    LOCK_FILENAME       = "building"
+    HASH_BLOCK_SIZE     = 1 << 20
+
+    def __init__(self, cache_dir=None, logMessage=None):
+        self.cache_dir      = cache_dir if cache_dir is not None else Constants.BUILD_CACHE_DIR
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+        self.parser_version = parserVersion()
+
+
+    def open(self, filename):
+        """Return a session on the cached database for an A2L, importing it first when there is none"""
+        build_dir = self.buildDir(filename)
+        build_lock = BuildLock(os.path.join(build_dir, self.LOCK_FILENAME))
+
+        #wait for a build running in another process instead of starting a second one
+        waiting = False
+        while True:
+            db_filename = self.cachedDatabase(build_dir)
+            if db_filename is not None:
+                self.logMessage(f"Opening cached database - {db_filename}")
+                return DB().open_existing(db_filename)
+
+            if build_lock.acquire():
+                break
+
+            if not waiting:
+                self.logMessage(f"Waiting for the database being built in the background - {filename}")
+                waiting = True
+
+            time.sleep(1)
+
+        try:
+            self.logMessage(f"Wait for database to build - {filename}")
+            return self.build(filename, build_dir)
+
+        finally:
+            build_lock.release()
+
+
+    def build(self, filename, build_dir, progress_bar=True):
+        os.makedirs(build_dir, exist_ok=True)
+        a2lsession = DB().import_a2l(filename, encoding="latin-1", output_dir=build_dir, force_overwrite=True, progress_bar=progress_bar)
+
+        #only a finished import is marked complete, an interrupted one is rebuilt next time
+        with open(os.path.join(build_dir, self.COMPLETE_FILENAME), "w", encoding="utf-8") as complete_file:
+            complete_file.write(os.path.basename(a2lsession.get_bind().url.database))
+
+        self.prune(build_dir)
+        return a2lsession
+
+
+    def buildDir(self, filename):
+        return os.path.join(self.cache_dir, f"{self.contentHash(filename)}-{self.parser_version}")
+
+
+    def cachedDatabase(self, build_dir):
+        """Return the database filename of a completed build, None when there is none"""
+        try:
+            with open(os.path.join(build_dir, self.COMPLETE_FILENAME), "r", encoding="utf-8") as complete_file:
+                db_filename = os.path.join(build_dir, complete_file.read().strip())
+
+        except OSError:
+            return None
+
+        if not os.path.isfile(db_filename):
+            return None
+
+        #the marker's mtime records the last use, the least recently used builds are pruned first
+        try:
+            os.utime(os.path.join(build_dir, self.COMPLETE_FILENAME))
+
+        except OSError:
+            pass
+
+        return db_filename
+
+
+    def prune(self, keep_dir=None):
+        """Remove index entries of A2Ls that no longer exist and the least recently used builds over the size cap"""
+        index = self._readIndex()
+        existing = {path: entry for path, entry in index.items() if os.path.isfile(path)}
+        if len(existing) != len(index):
+            self._writeIndex(existing)
+
+        builds = []
+        total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_dir():
+                continue
+
+            size = 0
+            for dirpath, dirnames, files in os.walk(entry.path):
+                for file in files:
+                    try:
+                        size += os.path.getsize(os.path.join(dirpath, file))
+
+                    except OSError:
+                        pass
+
+            try:
+                last_used = os.path.getmtime(os.path.join(entry.path, self.COMPLETE_FILENAME))
+
+            except OSError:
+                #an interrupted build, never used
+                last_used = 0.0
+
+            total_size += size
+            builds.append((last_used, size, entry.path))
+
+        for last_used, size, build_dir in sorted(builds):
+            if total_size <= Constants.BUILD_CACHE_MAX_BYTES:
+                break
+
+            #the build just made and builds still running in other processes are kept
+            if build_dir == keep_dir or BuildLock(os.path.join(build_dir, self.LOCK_FILENAME)).isHeld():
+                continue
+
+            #drop the marker first, a build that is only partly removed is then rebuilt rather than opened
+            try:
+                os.remove(os.path.join(build_dir, self.COMPLETE_FILENAME))
+
+            except OSError:
+                pass
+
+            shutil.rmtree(build_dir, ignore_errors=True)
+            total_size -= size
+            self.logMessage(f"Removed cached database - {build_dir}")
+
+
+    def contentHash(self, filename):
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+
+        index = self._readIndex()
+        entry = index.get(path)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            return entry["hash"]
+
+        content_hash = hashlib.sha256()
+        with open(path, "rb") as a2lfile:
+            while block := a2lfile.read(self.HASH_BLOCK_SIZE):
+                content_hash.update(block)
+
+        index[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": content_hash.hexdigest()}
+        self._writeIndex(index)
+
+        return index[path]["hash"]
+
+
+    def _readIndex(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILENAME), "r", encoding="utf-8") as index_file:
+                return json.load(index_file)
+
+        except (OSError, ValueError):
+            return {}
+
+
+    def _writeIndex(self, index):
+        #write a temporary file and swap it in so a reader never sees half an index
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_filename = os.path.join(self.cache_dir, self.INDEX_FILENAME)
+        temp_filename = f"{index_filename}.{os.getpid()}.tmp"
+        with open(temp_filename, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file)
+
+        os.replace(temp_filename, index_filename)
@@ -0,0 +1,251 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import concurrent.futures
+import lib.Helpers as Helpers
+import lib.Constants as Constants
+from lib.Database import Database
+from lib.BuildCache import buildFile
+from lib.SearchEngine import SearchEngine
+from lib.ListRefresh import ListRefresh
+from lib.DatabaseDiff import DatabaseDiff
+from lib.Constants import SearchPosition
+from lib.Constants import SearchType
+
+
+#headless commands, none of these import Qt
+COMMANDS = ["export", "precompile", "refresh", "diff"]
+
+
+SEARCH_TYPES = {
+    "name"      : SearchType.NAME,
+    "desc"      : SearchType.DESC,
+    "addr"      : SearchType.ADDR,
+}
+
+
+SEARCH_POSITIONS = {
+    "start"     : SearchPosition.START,
+    "contain"   : SearchPosition.CONTAIN,
+    "end"       : SearchPosition.END,
+    "eq"        : SearchPosition.EQ,
+}
+
+
+def logMessage(message):
+    print(message, file=sys.stderr)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="a2l2csv.py", description="A2L to CSV converter, headless commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export matching measurements to a PID list CSV")
+    export_parser.add_argument("--db", required=True, help=".a2l, .a2ldb or .csv database to load")
+    export_parser.add_argument("--query", action="append", help="Search string, may be given more than once (default: everything)")
+    export_parser.add_argument("--type", choices=SEARCH_TYPES.keys(), default="name", help="Field to search (default: name)")
+    export_parser.add_argument("--position", choices=SEARCH_POSITIONS.keys(), default="contain", help="Where the search string must match (default: contain)")
+    export_parser.add_argument("--limit", type=int, default=None, help="Maximum number of items per query (default: no limit)")
+    export_parser.add_argument("--out", required=True, help="PID list CSV to write")
+    export_parser.set_defaults(function=export)
+
+    precompile_parser = commands.add_parser("precompile", help="Build the databases of every A2L in a directory")
+    precompile_parser.add_argument("directory", help="Directory to search for .a2l files")
+    precompile_parser.add_argument("--recursive", action="store_true", help="Also search subdirectories")
+    precompile_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: one per core)")
+    precompile_parser.set_defaults(function=precompile)
+
+    refresh_parser = commands.add_parser("refresh", help="Refresh the database derived columns of a PID list CSV")
+    refresh_parser.add_argument("--db", required=True, help=".a2l, .a2ldb or .csv database to load")
+    refresh_parser.add_argument("--list", required=True, help="PID list CSV to refresh")
+    refresh_parser.add_argument("--out", required=True, help="PID list CSV to write, may be the same file as --list")
+    refresh_parser.set_defaults(function=refresh)
+
+    diff_parser = commands.add_parser("diff", help="Report the measurements that changed between two databases")
+    diff_parser.add_argument("old", help="Old .a2l, .a2ldb or .csv database")
+    diff_parser.add_argument("new", help="New .a2l, .a2ldb or .csv database")
+    diff_parser.add_argument("--out", required=True, help="Change report to write, .json for JSON, otherwise CSV")
+    diff_parser.add_argument("--map", default=None, help="Optional CSV of old to new addresses for the measurements that moved")
+    diff_parser.set_defaults(function=diff)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+
+def export(args):
+    start_time = time.time()
+
+    #the process exits after the export, so there is no point starting a background build
+    database = Database(logMessage, background_build=False)
+    if not database.load(args.db):
+        return 1
+
+    with open(args.out, "w", encoding="latin-1", newline='') as csvfile:
+        csvwriter = csv.DictWriter(csvfile, fieldnames=Constants.LIST_DATA_COLUMNS)
+        csvwriter.writeheader()
+
+        #stream each row straight to the file, skipping names already written
+        written_names = set()
+        skipped_count = 0
+        engine = SearchEngine(database, logMessage)
+        for query in args.query if args.query else [""]:
+            for item in engine.search(SEARCH_TYPES[args.type], SEARCH_POSITIONS[args.position], query, args.limit):
+                if item["Name"] in written_names:
+                    continue
+
+                #the warning limits are derived from Min and Max, a CSV database may leave them blank
+                try:
+                    list_item = Helpers.search_to_list_item(item)
+
+                except ValueError:
+                    logMessage(f"Skipped {item['Name']}: Min or Max is not a number")
+                    skipped_count += 1
+                    continue
+
+                written_names.add(item["Name"])
+                csvwriter.writerow(list_item)
+
+            if engine.truncated:
+                logMessage(f"Query {query} stopped at {args.limit} items")
+
+    elapsed_time = time.time() - start_time
+    logMessage(f"Exported {len(written_names)} items to {args.out} in {elapsed_time:.2f} seconds{f', skipped {skipped_count}' if skipped_count else ''}")
+    return 0
+
+
+def refresh(args):
+    start_time = time.time()
+
+    with open(args.list, "r", encoding="latin-1", newline='') as csvfile:
+        csvreader = csv.DictReader(csvfile)
+        for column_str in Constants.LIST_DATA_COLUMNS_REQUIRED:
+            if column_str not in (csvreader.fieldnames or []):
+                logMessage(f"Refresh failed: {args.list} does not contain {column_str}")
+                return 1
+
+        items = list(csvreader)
+
+    database = Database(logMessage, background_build=False)
+    if not database.load(args.db):
+        return 1
+
+    list_refresh = ListRefresh(database, logMessage)
+    for changes, row in list_refresh.refresh([(item, row) for row, item in enumerate(items)]):
+        items[row].update(changes)
+
+    with open(args.out, "w", encoding="latin-1", newline='') as csvfile:
+        csvwriter = csv.DictWriter(csvfile, fieldnames=Constants.LIST_DATA_COLUMNS, extrasaction="ignore")
+        csvwriter.writeheader()
+        csvwriter.writerows(items)
+
+    elapsed_time = time.time() - start_time
+    logMessage(f"{list_refresh.summary()} in {elapsed_time:.2f} seconds")
+    return 0
+
+
+def diff(args):
+    start_time = time.time()
+
+    databases = []
+    for filename in (args.old, args.new):
+        database = Database(logMessage, background_build=False)
+        if not database.load(filename):
+            return 1
+
+        databases.append(database)
+
+    database_diff = DatabaseDiff(*databases, logMessage)
+    changes = database_diff.compare()
+
+    if args.out.lower().endswith(".json"):
+        writeDiffJSON(args.out, changes)
+
+    else:
+        writeDiffCSV(args.out, changes)
+
+    if args.map:
+        with open(args.map, "w", encoding="latin-1", newline='') as csvfile:
+            csvwriter = csv.writer(csvfile)
+            csvwriter.writerow(["Name", "Old Address", "New Address"])
+            csvwriter.writerows(database_diff.addressMap(changes))
+
+    elapsed_time = time.time() - start_time
+    logMessage(f"{database_diff.summary()} in {elapsed_time:.2f} seconds")
+    return 0
+
+
+def writeDiffCSV(filename, changes):
+    #one row per change, the old and new value of every compared column side by side
+    fieldnames = ["Change", "Name", "Columns"]
+    for column in Constants.DIFF_COLUMNS:
+        fieldnames += [f"Old {column}", f"New {column}"]
+
+    with open(filename, "w", encoding="latin-1", newline='') as csvfile:
+        csvwriter = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        csvwriter.writeheader()
+
+        for change in changes:
+            row = {"Change": change["Change"], "Name": change["Name"], "Columns": ";".join(change["Columns"])}
+            for column in Constants.DIFF_COLUMNS:
+                row[f"Old {column}"] = change["Old"][column] if change["Old"] is not None else ""
+                row[f"New {column}"] = change["New"][column] if change["New"] is not None else ""
+
+            csvwriter.writerow(row)
+
+
+def writeDiffJSON(filename, changes):
+    #changed measurements only list the columns that differ, added and removed ones the whole row
+    report = []
+    for change in changes:
+        entry = {"Change": change["Change"], "Name": change["Name"]}
+        if change["Change"] == DatabaseDiff.CHANGED:
+            entry["Columns"] = {column: {"Old": change["Old"][column], "New": change["New"][column]} for column in change["Columns"]}
+
+        else:
+            entry["Row"] = change["Old"] if change["Old"] is not None else change["New"]
+
+        report.append(entry)
+
+    with open(filename, "w", encoding="utf-8") as jsonfile:
+        json.dump(report, jsonfile, indent=1)
+
+
+def precompile(args):
+    start_time = time.time()
+
+    filenames = []
+    for dirpath, dirnames, files in os.walk(args.directory):
+        filenames.extend(os.path.join(dirpath, file) for file in sorted(files) if file.lower().endswith(".a2l"))
+        if not args.recursive:
+            break
+
+    if len(filenames) == 0:
+        logMessage(f"No A2L files found in {args.directory}")
+        return 1
+
+    workers = args.workers if args.workers is not None else (os.cpu_count() or 1)
+    logMessage(f"Precompiling {len(filenames)} A2L files with {workers} workers")
+
+    #one file per task, a failure only affects its own file
+    results = {"built": 0, "cached": 0, "building": 0, "failed": 0}
+    build_time = 0.0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(buildFile, filename): filename for filename in filenames}
+        for count, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+            try:
+                filename, status, elapsed_time, message = future.result()
+
+            except Exception as e:
+                #the worker process itself died
+                filename, status, elapsed_time, message = futures[future], "failed", 0.0, str(e)
+
+            results[status] += 1
+            build_time += elapsed_time
+            logMessage(f"[{count}/{len(filenames)}] {status} {filename} in {elapsed_time:.2f} seconds{f' - {message}' if message else ''}")
+
+    elapsed_time = time.time() - start_time
+    logMessage(f"Precompiled {len(filenames)} files in {elapsed_time:.2f} seconds ({build_time:.2f} seconds of work): {results['built']} built, {results['cached']} cached, {results['building']} already building, {results['failed']} failed")
+    return 1 if results["failed"] else 0
@@ -1,6 +1,5 @@
+import os
 from enum import Enum
-from PyQt6.QtGui import QColor
-from PyQt6.QtWidgets import QTableWidgetItem
 
 
 #list of constants for application
@@ -9,20 +8,52 @@ APPLICATION_VERSION_MAJOR       = 0
 APPLICATION_VERSION_MINOR       = 4
 APPLICATION_VERSION_STRING      = f"A2L2CSV v{APPLICATION_VERSION_MAJOR}.{APPLICATION_VERSION_MINOR}"
 SEARCH_DATA_COLUMNS             = ["Name", "Unit", "Equation", "Format", "Address", "Length", "Signed", "Min", "Max", "Description"]
+SEARCH_SOURCE_COLUMNS           = ["DataType", "Conversion"]
+SEARCH_ROW_COLUMNS              = SEARCH_DATA_COLUMNS + SEARCH_SOURCE_COLUMNS
 SEARCH_COLUMN_SIZES             = [175, 50, 200, 50, 85, 45, 50, 50, 50, 750]
 LIST_DATA_COLUMNS_REQUIRED      = ["Name", "Unit", "Equation", "Format", "Address", "Length", "Signed", "ProgMin", "ProgMax", "WarnMin", "WarnMax", "Smoothing", "Enabled", "Tabs", "Assign To"]
 LIST_DATA_COLUMNS               = LIST_DATA_COLUMNS_REQUIRED + ["Description"]
 LIST_COLUMN_SIZES               = [175, 50, 200, 75, 85, 50, 50, 65, 65, 65, 65, 65, 50, 150, 150, 750]
 VIRTUAL_ADDRESSES               = ["0XFF", "0XFFFF", "0XFFFFFFFF"]
-NORMAL_BACKGROUND_COLOR         = QTableWidgetItem().background()
-DUPLICATE_BACKGROUND_COLOR      = QColor(120, 24, 24)
 MAX_SEARCH_ITEMS                = 20000
 SEARCH_BATCH_SIZE               = 100
+SEARCH_AS_YOU_TYPE              = True
+SEARCH_DEBOUNCE_MS              = 250
+SEARCH_CACHE_ROWS               = 100000
+SQL_IN_CHUNK_SIZE               = 500
+SQL_FETCH_SIZE                  = 500
+SQL_PROGRESS_STEPS              = 1000
+REPLACE_BULK_RELINK             = True
+REPLACE_BATCH_SIZE              = 500
 APPLY_SQL_OPTIMIZATIONS         = False
+USE_FULL_TEXT_INDEX             = True
+LOG_QUERY_PLANS                 = False
+USE_BUILD_CACHE                 = True
+USE_FAST_A2L_LOADER             = True
+BUILD_CACHE_DIR                 = os.path.join(os.path.expanduser("~"), ".a2l2csv", "cache")
+BUILD_CACHE_MAX_BYTES           = 4 << 30
 CHECK_FOR_DUPLICATES            = True
 FORMAT_PRECISION_LIMIT          = 3
 
 
+#PID list columns rewritten by a refresh from the database and the search result column they come from
+LIST_REFRESH_COLUMNS = {
+    "Unit"          : "Unit",
+    "Equation"      : "Equation",
+    "Format"        : "Format",
+    "Length"        : "Length",
+    "Signed"        : "Signed",
+    "ProgMin"       : "Min",
+    "ProgMax"       : "Max",
+    "Description"   : "Description",
+}
+
+
+#search result columns compared by a diff of two databases,
+#DataType and Conversion are the A2L datatype and CompuMethod name, a CSV database has neither
+DIFF_COLUMNS                    = ["Address", "DataType", "Length", "Signed", "Conversion", "Unit", "Equation", "Format", "Min", "Max", "Description"]
+
+
 DATA_LENGTH = {
     "UWORD": "2",
     "UBYTE": "1",
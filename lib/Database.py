@@ -0,0 +1,262 @@
+import csv
+import time
+import multiprocessing
+import lib.Helpers as Helpers
+import lib.Constants as Constants
+from sqlalchemy import select
+from pya2l import DB, model
+from lib.Constants import DBType
+from lib.TextIndex import TextIndex
+from lib.RecordStore import Record
+from lib.AddressIndex import AddressIndex, parseAddress
+from lib.A2LFastParser import A2LFastParser
+from lib.BuildCache import BuildCache, buildFile, buildLock, hasBuild
+from lib.FullTextIndex import FullTextIndex
+from lib.IndexManager import IndexManager
+from lib.SearchCache import SearchCache
+from lib.SearchEngine import SearchEngine, NO_COMPU_METHOD
+
+
+class Database():
+    """
+    Handle for a loaded A2L or CSV database and its search indexes.
+    Loading does not depend on Qt, messages are passed to the logMessage callback.
+    """
+    def __init__(self, logMessage=None, background_build=True):
+        self.logMessage         = logMessage if logMessage is not None else (lambda message: None)
+        self.background_build   = background_build
+        self.build_process      = None
+
+        self.db_type        = DBType.NONE
+        self.a2ldb          = None
+        self.a2lsession     = None
+        self.csv_name_db    = {}
+        self.csv_desc_db    = {}
+        self.csv_address_db = {}
+        self.csv_records    = []
+        self.csv_name_index = None
+        self.csv_desc_index = None
+        self.address_index  = None
+        self.text_index     = None
+        self.filename       = ""
+
+        #the records come from the fast A2L parser, they are searched with the SQL semantics of the built database
+        self.fast_a2l           = False
+
+        #measurements of a fast loaded A2L that a search skips, only read by a diff
+        self.unlisted_records   = []
+
+        #conversion name -> (unit, equation, format), filled by SearchEngine on first use
+        self.compu_method_cache = None
+
+        #complete results of recent searches on this database
+        self.search_cache       = SearchCache()
+
+
+    def load(self, filename):
+        self.filename = filename
+        self.logMessage(f"Loading file: {self.filename}")
+
+        try:
+            file_extension = self.filename.split(".")[-1]
+
+            if file_extension.lower() == "csv":
+                self._loadCSV()
+
+            else:
+                self._loadA2L()
+
+        except Exception as e:
+            self.logMessage(f"Failed to load: {e}")
+
+        return self.db_type != DBType.NONE
+
+
+    def invalidateCaches(self):
+        self.compu_method_cache = None
+        self.search_cache.clear()
+
+
+    def _loadA2L(self):
+        #an A2L without a built database is searched from the fast parser while pya2l builds it
+        if Constants.USE_FAST_A2L_LOADER and self.filename.lower().endswith(".a2l") and not hasBuild(self.filename):
+            try:
+                self._loadFastA2L()
+                return
+
+            except Exception as e:
+                self.logMessage(f"Fast load failed, building the database instead: {e}")
+                self._clearRecords()
+
+        self.a2ldb = DB()
+
+        #an A2L opens the build cached for its content, so an edited file is never served a stale database
+        if Constants.USE_BUILD_CACHE and self.filename.lower().endswith(".a2l"):
+            self.a2lsession = BuildCache(logMessage=self.logMessage).open(self.filename)
+
+        else:
+            try:
+                self.a2lsession = (
+                    self.a2ldb.open_existing(self.filename)
+                )
+
+            except:
+                self.logMessage(f"Wait for database to build - {self.filename}")
+
+                self.a2lsession = (
+                    self.a2ldb.import_a2l(self.filename, encoding="latin-1")
+                )
+
+        #indexes, statistics and connection pragmas for the searches
+        index_manager = IndexManager(self.a2lsession, self.logMessage)
+        index_manager.ensure()
+
+        #build the address index once at load time
+        rows = self.a2lsession.execute(
+            select(model.EcuAddress.address, model.Measurement.name, model.Measurement.rid)
+                .join(model.Measurement, model.Measurement.rid == model.EcuAddress._measurement_rid)
+        )
+        self.address_index = AddressIndex((address, (name, rid)) for address, name, rid in rows)
+
+        #the full text index is stored in the .a2ldb, so this only builds it the first time
+        if Constants.USE_FULL_TEXT_INDEX:
+            self.text_index = FullTextIndex(self.a2lsession, self.logMessage)
+            self.text_index.ensure()
+
+        if Constants.LOG_QUERY_PLANS:
+            index_manager.logQueryPlans(SearchEngine(self))
+
+        self.db_type = DBType.A2L
+        self.logMessage(f"Finished")
+
+
+    def _loadFastA2L(self):
+        start_time = time.time()
+        measurements, compu_methods = A2LFastParser(self.filename).parse()
+
+        #the same unit, equation and format strings as a search of the built database
+        engine = SearchEngine(self)
+        conversions = {
+            name: (unit, engine.getEquationFromCoeffs(coeffs), engine.getFormat(compu_format)) for name, (unit, compu_format, coeffs) in compu_methods.items()
+        }
+
+        min_strings = Helpers.floats_to_str(measurement[4] for measurement in measurements)
+        max_strings = Helpers.floats_to_str(measurement[5] for measurement in measurements)
+
+        #store the measurements in the record store used for CSV databases
+        for (name, description, datatype, conversion, lower_limit, upper_limit, address), min_str, max_str in zip(measurements, min_strings, max_strings):
+            unit, equation, format_str = conversions.get(conversion, NO_COMPU_METHOD)
+
+            #the record also keeps the datatype and CompuMethod name for a diff
+            record = Record(Helpers.search_to_list_item({
+                "Name"          : name,
+                "Unit"          : unit,
+                "Equation"      : equation,
+                "Format"        : format_str,
+                "Address"       : hex(address) if address is not None else "",
+                "Length"        : Constants.DATA_LENGTH.get(datatype, ""),
+                "Signed"        : Constants.DATA_SIGNED.get(datatype, ""),
+                "Min"           : min_str,
+                "Max"           : max_str,
+                "Description"   : description
+            }) | {"DataType": datatype, "Conversion": conversion})
+
+            #like the database search, only measurements with an address and a known conversion are searchable
+            if address is None or conversion not in conversions or datatype not in Constants.DATA_LENGTH:
+                self.unlisted_records.append(record)
+                continue
+
+            record_index = len(self.csv_records)
+            self.csv_records.append(record)
+
+            #measurements often share a description, each one maps to all of them
+            self.csv_name_db[name] = record_index
+            self.csv_desc_db.setdefault(description, []).append(record_index)
+            self.csv_address_db[hex(address)] = record_index
+
+        #return the measurements of a description in name order, like the database search
+        for record_indexes in self.csv_desc_db.values():
+            record_indexes.sort(key=lambda record_index: self.csv_records[record_index].name)
+
+        self.csv_name_index = TextIndex(self.csv_name_db.keys())
+        self.csv_desc_index = TextIndex(self.csv_desc_db.keys())
+
+        #index every measurement, an A2L often has several at one address
+        self.address_index  = AddressIndex(
+            (int(record.address, 16), (record.name, record_index)) for record_index, record in enumerate(self.csv_records)
+        )
+
+        self.db_type = DBType.CSV
+        self.fast_a2l = True
+
+        elapsed_time = time.time() - start_time
+        self.logMessage(f"Read {len(self.csv_records)} measurements in {elapsed_time:.2f} seconds")
+
+        #only the cache marks a finished build, so an interrupted build is never opened
+        if self.background_build and Constants.USE_BUILD_CACHE:
+            self._startBackgroundBuild()
+
+        self.logMessage(f"Finished")
+
+
+    def _startBackgroundBuild(self):
+        #reopening the file while its build runs must not start a second one
+        if buildLock(self.filename).isHeld():
+            self.logMessage("The database is already being built in the background, it is used the next time this file is opened")
+            return
+
+        try:
+            #a daemon process is stopped with the application, the build then starts again next time
+            self.build_process = multiprocessing.get_context("spawn").Process(target=buildFile, args=(self.filename,), daemon=True)
+            self.build_process.start()
+            self.logMessage("Building the database in the background, it is used the next time this file is opened")
+
+        except Exception as e:
+            #the measurements are already searchable, only the build for the next open is lost
+            self.build_process = None
+            self.logMessage(f"Note: Could not start the background build: {e}")
+
+
+    def _clearRecords(self):
+        self.csv_name_db    = {}
+        self.csv_desc_db    = {}
+        self.csv_address_db = {}
+        self.csv_records    = []
+        self.csv_name_index = None
+        self.csv_desc_index = None
+        self.address_index  = None
+        self.fast_a2l           = False
+        self.unlisted_records   = []
+
+
+    def _loadCSV(self):
+        with open(self.filename, "r", encoding="latin-1", newline='') as csvfile:
+            csvreader = csv.DictReader(csvfile)
+
+            for column_str in Constants.LIST_DATA_COLUMNS_REQUIRED:
+                if column_str not in csvreader.fieldnames:
+                    self.logMessage(f"Failed to load: does not contain {column_str}")
+                    return
+
+            has_description = "Description" in csvreader.fieldnames
+            for row in csvreader:
+                #store each row once, the lookups only hold its index
+                record_index = len(self.csv_records)
+                self.csv_records.append(Record(row))
+
+                self.csv_name_db[row["Name"]] = record_index
+
+                if has_description:
+                    self.csv_desc_db[row["Description"]] = record_index
+
+                self.csv_address_db[row["Address"]] = record_index
+
+            #build the search indexes once at load time
+            self.csv_name_index = TextIndex(self.csv_name_db.keys())
+            self.csv_desc_index = TextIndex(self.csv_desc_db.keys())
+            self.address_index  = AddressIndex(
+                (address, (self.csv_records[record_index].name, record_index)) for key, record_index in self.csv_address_db.items() if (address := parseAddress(key)) is not None
+            )
+
+            self.db_type = DBType.CSV
+            self.logMessage(f"Finished loading {len(self.csv_name_db)} items")
\ No newline at end of file
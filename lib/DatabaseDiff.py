@@ -0,0 +1,107 @@
+import time
+import lib.Constants as Constants
+from lib.SearchEngine import SearchEngine
+from lib.AddressIndex import parseAddress
+
+
+class DatabaseDiff():
+    """
+    Compares the measurements of two loaded databases, for example two software versions.
+    Both are read into name sorted arrays and merge joined in a single pass, each change
+    records which of the DIFF_COLUMNS differ with the old and new values.
+    """
+    ADDED       = "added"
+    REMOVED     = "removed"
+    CHANGED     = "changed"
+
+    def __init__(self, old_database, new_database, logMessage=None):
+        self.old_database   = old_database
+        self.new_database   = new_database
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+        self.counts         = {}
+        self.column_counts  = {}
+
+
+    def compare(self):
+        """Return the changes in name order, each a dict with Change, Name, Columns, Old and New"""
+        start_time = time.time()
+        old_rows = self._sortedRows(self.old_database)
+        new_rows = self._sortedRows(self.new_database)
+
+        self.counts         = {self.ADDED: 0, self.REMOVED: 0, self.CHANGED: 0, "unchanged": 0}
+        self.column_counts  = {column: 0 for column in Constants.DIFF_COLUMNS}
+
+        changes = []
+        old_index = 0
+        new_index = 0
+        while old_index < len(old_rows) or new_index < len(new_rows):
+            old_row = old_rows[old_index] if old_index < len(old_rows) else None
+            new_row = new_rows[new_index] if new_index < len(new_rows) else None
+
+            if new_row is None or (old_row is not None and old_row["Name"] < new_row["Name"]):
+                changes.append(self._change(self.REMOVED, old_row["Name"], [], old_row, None))
+                old_index += 1
+
+            elif old_row is None or new_row["Name"] < old_row["Name"]:
+                changes.append(self._change(self.ADDED, new_row["Name"], [], None, new_row))
+                new_index += 1
+
+            else:
+                columns = [column for column in Constants.DIFF_COLUMNS if not self._sameValue(column, old_row[column], new_row[column])]
+                if columns:
+                    changes.append(self._change(self.CHANGED, old_row["Name"], columns, old_row, new_row))
+
+                else:
+                    self.counts["unchanged"] += 1
+
+                old_index += 1
+                new_index += 1
+
+        elapsed_time = time.time() - start_time
+        self.logMessage(f"Compared {len(old_rows)} with {len(new_rows)} measurements in {elapsed_time:.2f} seconds")
+        return changes
+
+
+    def addressMap(self, changes):
+        """Return (name, old address, new address) for every measurement that moved"""
+        return [(change["Name"], change["Old"]["Address"], change["New"]["Address"]) for change in changes if "Address" in change["Columns"]]
+
+
+    def summary(self):
+        column_counts = ", ".join(f"{column} {count}" for column, count in self.column_counts.items() if count)
+        return (
+            f"{self.counts[self.CHANGED]} changed, {self.counts[self.ADDED]} added, "
+            f"{self.counts[self.REMOVED]} removed, {self.counts['unchanged']} unchanged"
+            f"{f' ({column_counts})' if column_counts else ''}"
+        )
+
+
+    def _sortedRows(self, database):
+        #one row per name, the first wins as it does for a name lookup
+        rows = {}
+        for row in SearchEngine(database, self.logMessage).rows():
+            rows.setdefault(row["Name"], row)
+
+        return [rows[name] for name in sorted(rows)]
+
+
+    def _change(self, change_type, name, columns, old_row, new_row):
+        self.counts[change_type] += 1
+        for column in columns:
+            self.column_counts[column] += 1
+
+        return {"Change": change_type, "Name": name, "Columns": columns, "Old": old_row, "New": new_row}
+
+
+    def _sameValue(self, column, old_value, new_value):
+        #compare addresses numerically so 0x1234 matches 0X00001234
+        if column == "Address":
+            old_address = parseAddress(old_value)
+            if old_address is not None:
+                return old_address == parseAddress(new_value)
+
+        #a CSV database has no datatype or CompuMethod name to compare with
+        if column in Constants.SEARCH_SOURCE_COLUMNS and (not old_value or not new_value):
+            return True
+
+        return old_value == new_value
@@ -0,0 +1,85 @@
+import time
+from sqlalchemy import select, table, column, text
+from pya2l import model
+from lib.Constants import SearchPosition
+from lib.Constants import SearchType
+
+
+class FullTextIndex():
+    """
+    FTS5 trigram index over the measurement name and long identifier.
+    The index is a table inside the .a2ldb, so it is only built the first time a database is opened.
+    """
+    TABLE_NAME          = "measurement_fts"
+    MIN_PATTERN_LENGTH  = 3     #trigrams need at least 3 characters, shorter patterns would scan the whole index
+
+    def __init__(self, a2lsession, logMessage=None):
+        self.a2lsession     = a2lsession
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+        self.available      = False
+        self.fts_table      = table(self.TABLE_NAME, column("rowid"), column("name"), column("longIdentifier"))
+
+
+    def ensure(self):
+        """Build the index if the database does not have one yet, returns True when it can be used"""
+        try:
+            exists = self.a2lsession.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": self.TABLE_NAME}
+            ).first()
+
+            if exists is None:
+                start_time = time.time()
+
+                # External content table, the text stays in measurement and only the trigrams are stored
+                self.a2lsession.execute(text(
+                    f"CREATE VIRTUAL TABLE {self.TABLE_NAME} USING fts5("
+                    "name, longIdentifier, content='measurement', content_rowid='rid', tokenize='trigram')"
+                ))
+                self.a2lsession.execute(text(f"INSERT INTO {self.TABLE_NAME}({self.TABLE_NAME}) VALUES('rebuild')"))
+                self.a2lsession.commit()
+
+                elapsed_time = time.time() - start_time
+                self.logMessage(f"Built full text index in {elapsed_time:.2f} seconds")
+
+            self.available = True
+
+        except Exception as e:
+            self.a2lsession.rollback()
+            self.logMessage(f"Note: Full text index unavailable, using table scans: {e}")
+            self.available = False
+
+        return self.available
+
+
+    def filter(self, search_type, search_position, search_string):
+        """
+        Return a Measurement filter that narrows a text search through the index,
+        or None when the index cannot serve this search
+        """
+        if not self.available or search_position == SearchPosition.EQ:
+            return None
+
+        if search_type == SearchType.NAME:
+            fts_column = self.fts_table.c.name
+
+        elif search_type == SearchType.DESC:
+            fts_column = self.fts_table.c.longIdentifier
+
+        else:
+            return None
+
+        # LIKE wildcards do not count towards the trigrams
+        if len(search_string.replace("%", "").replace("_", "")) < self.MIN_PATTERN_LENGTH:
+            return None
+
+        if search_position == SearchPosition.START:
+            pattern = f"{search_string}%"
+
+        elif search_position == SearchPosition.END:
+            pattern = f"%{search_string}"
+
+        else:
+            pattern = f"%{search_string}%"
+
+        # The trigram tokenizer answers LIKE from the index
+        return model.Measurement.rid.in_(select(self.fts_table.c.rowid).where(fts_column.like(pattern)))
@@ -1,4 +1,9 @@
 import decimal
+import functools
+
+
+# one context shared by every call, rounding to 5 significant digits
+FLOAT_CONTEXT = decimal.Context(prec=5)
 
 
 """
@@ -6,9 +11,56 @@ Convert the given float to a string,
 without resorting to scientific notation
 """
 def float_to_str(f):
-    # create a new context for this task
-    ctx = decimal.Context()
-    ctx.prec = 5
+    return _repr_to_str(repr(f))
+
+
+"""
+Convert every float of the given iterable to a string,
+values repeated within the column are only formatted once
+"""
+def floats_to_str(values):
+    column_cache = {}
+    strings = []
+    for f in values:
+        text = repr(f)
+        string = column_cache.get(text)
+        if string is None:
+            string = column_cache[text] = _repr_to_str(text)
+
+        strings.append(string)
+
+    return strings
 
-    d1 = ctx.create_decimal(repr(f))
-    return format(d1, 'f')
\ No newline at end of file
+
+"""
+Memoised on repr(f) rather than f, so 1 and 1.0 or
+0.0 and -0.0 keep their own formatting
+"""
+@functools.lru_cache(maxsize=4096)
+def _repr_to_str(text):
+    return format(FLOAT_CONTEXT.create_decimal(text), 'f')
+
+
+"""
+Convert a search result item to a PID list item,
+warning limits are set one below and above the min and max
+"""
+def search_to_list_item(item):
+    return {
+        "Name"          : item["Name"],
+        "Unit"          : item["Unit"],
+        "Equation"      : item["Equation"],
+        "Format"        : item["Format"],
+        "Address"       : item["Address"],
+        "Length"        : item["Length"],
+        "Signed"        : item["Signed"],
+        "ProgMin"       : item["Min"],
+        "ProgMax"       : item["Max"],
+        "WarnMin"       : float_to_str(float(item["Min"]) - 1),
+        "WarnMax"       : float_to_str(float(item["Max"]) + 1),
+        "Smoothing"     : "0",
+        "Enabled"       : "TRUE",
+        "Tabs"          : "",
+        "Assign To"     : "",
+        "Description"   : item["Description"]
+    }
\ No newline at end of file
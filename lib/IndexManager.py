@@ -0,0 +1,124 @@
+import time
+import lib.Constants as Constants
+from sqlalchemy import event, text
+from sqlalchemy.dialects import sqlite
+from lib.Constants import SearchPosition
+from lib.Constants import SearchType
+
+
+#indexes the searches rely on, created if pya2l did not make them
+#LIKE cannot use an expression index such as lower(name), text searches go through the full text index instead
+REQUIRED_INDEXES = {
+    "ix_measurement_name"               : "measurement (name)",
+    "ix_ecu_address_address"            : "ecu_address (address)",
+    "ix_ecu_address_measurement_rid"    : "ecu_address (_measurement_rid)",
+    "ix_compu_method_name"              : "compu_method (name)",
+    "ix_coeffs_compu_method_rid"        : "coeffs (_compu_method_rid)",
+}
+
+
+#read optimised pragmas, applied to every connection of the database
+READ_PRAGMAS = [
+    "PRAGMA cache_size=-64000",     # 64MB cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",   # 256MB memory map
+]
+
+
+#pragmas that change how the file is written, only with APPLY_SQL_OPTIMIZATIONS
+WRITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+]
+
+
+#search shapes whose query plans are logged after loading
+QUERY_PLAN_SEARCHES = [
+    (SearchType.NAME, SearchPosition.CONTAIN, "abc"),
+    (SearchType.NAME, SearchPosition.CONTAIN, "a"),
+    (SearchType.NAME, SearchPosition.START, "abc"),
+    (SearchType.NAME, SearchPosition.EQ, "abc"),
+    (SearchType.DESC, SearchPosition.CONTAIN, "abc"),
+    (SearchType.ADDR, SearchPosition.EQ, "0x1000"),
+]
+
+
+def applyPragmas(dbapi_connection, connection_record=None):
+    cursor = dbapi_connection.cursor()
+    for pragma in READ_PRAGMAS + (WRITE_PRAGMAS if Constants.APPLY_SQL_OPTIMIZATIONS else []):
+        cursor.execute(pragma)
+
+    cursor.close()
+
+
+class IndexManager():
+    """
+    Makes sure an opened pya2l database has the indexes, statistics and
+    connection settings the searches expect. Every step is idempotent.
+    """
+    def __init__(self, a2lsession, logMessage=None):
+        self.a2lsession     = a2lsession
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+
+
+    def ensure(self):
+        try:
+            start_time = time.time()
+
+            existing_indexes = set(name for name, in self.a2lsession.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")))
+            missing_indexes = [name for name in REQUIRED_INDEXES if name not in existing_indexes]
+            for name in missing_indexes:
+                self.a2lsession.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {REQUIRED_INDEXES[name]}"))
+
+            #refresh the planner statistics when the indexes changed or were never analysed
+            analysed = self.a2lsession.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")).first()
+            if missing_indexes or analysed is None:
+                self.a2lsession.execute(text("ANALYZE"))
+
+            self.a2lsession.commit()
+
+            if missing_indexes or analysed is None:
+                elapsed_time = time.time() - start_time
+                self.logMessage(f"Created {len(missing_indexes)} indexes and analysed database in {elapsed_time:.2f} seconds")
+
+        except Exception as e:
+            self.a2lsession.rollback()
+            self.logMessage(f"Note: Could not create database indexes: {e}")
+
+        self.applyPragmas()
+
+
+    def applyPragmas(self):
+        try:
+            #future connections from the pool get the pragmas as they are opened
+            engine = self.a2lsession.get_bind()
+            if not event.contains(engine, "connect", applyPragmas):
+                event.listen(engine, "connect", applyPragmas)
+
+            #the connection the session already holds
+            applyPragmas(self.a2lsession.connection().connection.dbapi_connection)
+
+        except Exception as e:
+            # If pragmas fail, log but continue - database will still work
+            self.logMessage(f"Note: Could not apply SQLite optimizations: {e}")
+
+
+    def logQueryPlans(self, engine):
+        """Log the EXPLAIN QUERY PLAN of each search shape, engine is a SearchEngine on this database"""
+        for search_type, search_position, search_string in QUERY_PLAN_SEARCHES:
+            try:
+                #with an address index, an address search only queries chunks of the rids found in it
+                if search_type == SearchType.ADDR and engine.database.address_index is not None:
+                    filter_type = engine.ridFilter(list(range(Constants.SQL_IN_CHUNK_SIZE)))
+                    search_string = f"{search_string} ({Constants.SQL_IN_CHUNK_SIZE} rids from the address index)"
+
+                else:
+                    filter_type = engine.a2lFilter(search_type, search_position, search_string)
+
+                statement = engine.a2lStatement(filter_type, Constants.MAX_SEARCH_ITEMS)
+                sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+                plan = [row[-1] for row in self.a2lsession.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+                self.logMessage(f"Query plan {search_type.name.lower()} {search_position.name.lower()} {search_string}: {'; '.join(plan)}")
+
+            except Exception as e:
+                self.logMessage(f"Note: Could not explain {search_type.name.lower()} {search_position.name.lower()} search: {e}")
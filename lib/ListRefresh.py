@@ -0,0 +1,67 @@
+import lib.Constants as Constants
+from lib.SearchEngine import SearchEngine
+
+
+class ListRefresh():
+    """
+    Rewrites the database derived columns of PID list items from a loaded database.
+    The whole list is joined by name with one batch lookup, the columns a user sets,
+    such as Smoothing, Enabled, Tabs and Assign To, are never changed.
+    """
+    def __init__(self, database, logMessage=None):
+        self.database       = database
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+        self.item_count     = 0
+        self.changed_count  = 0
+        self.missing_count  = 0
+        self.change_counts  = {}
+
+
+    def refresh(self, items):
+        """
+        items is a list of (item, row) pairs, returns (changes, row) pairs where
+        changes only holds the columns whose value differs from the database
+        """
+        self.item_count     = 0
+        self.changed_count  = 0
+        self.missing_count  = 0
+        self.change_counts  = {column: 0 for column in Constants.LIST_REFRESH_COLUMNS}
+
+        #virtual addresses are calculated PIDs, they are not in the database
+        items = [(item, row) for item, row in items if item["Address"].upper() not in Constants.VIRTUAL_ADDRESSES]
+        results = SearchEngine(self.database, self.logMessage).lookupNames(item["Name"] for item, row in items)
+
+        updates = []
+        for item, row in items:
+            self.item_count += 1
+
+            result = results.get(item["Name"])
+            if result is None:
+                self.logMessage(f"Unable to find name {item["Name"]} in database")
+                self.missing_count += 1
+                continue
+
+            changes = {}
+            for list_column, search_column in Constants.LIST_REFRESH_COLUMNS.items():
+                value = result[search_column]
+                if list_column == "Format" and not value:
+                    value = "%01.0f"
+
+                if item.get(list_column) != value:
+                    changes[list_column] = value
+                    self.change_counts[list_column] += 1
+
+            if changes:
+                updates.append((changes, row))
+                self.changed_count += 1
+
+        return updates
+
+
+    def summary(self):
+        column_counts = ", ".join(f"{column} {count}" for column, count in self.change_counts.items() if count)
+        return (
+            f"Refreshed {self.changed_count} out of {self.item_count} items"
+            f"{f' ({column_counts})' if column_counts else ''}"
+            f"{f', {self.missing_count} not found' if self.missing_count else ''}"
+        )
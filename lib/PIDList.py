@@ -0,0 +1,151 @@
+import lib.Constants as Constants
+
+
+class PIDList():
+    """
+    Columnar store for a PID list, one list of strings per LIST_DATA_COLUMNS column.
+    Rows are read and written as dictionaries keyed by column name.
+    An upper-cased address -> rows multimap is kept up to date with every edit,
+    so duplicates are only re-evaluated for the addresses that changed.
+    """
+    def __init__(self):
+        self.columns            = {column: [] for column in Constants.LIST_DATA_COLUMNS}
+        self.duplicates         = []
+        self.address_rows       = {}
+        self.address_rows_stale = False
+        self.dirty_addresses    = set()
+
+
+    def __len__(self):
+        return len(self.duplicates)
+
+
+    def value(self, row, column):
+        return self.columns[column][row]
+
+
+    def setValue(self, row, column, value):
+        if column == "Address":
+            self._unindexRow(row)
+
+        self.columns[column][row] = value
+
+        if column == "Address":
+            self._indexRow(row)
+
+
+    def getItem(self, row):
+        if row < 0 or row >= len(self):
+            return None
+
+        return {column: values[row] for column, values in self.columns.items()}
+
+
+    def items(self):
+        for row in range(len(self)):
+            yield self.getItem(row)
+
+
+    def appendItem(self, item):
+        for column, values in self.columns.items():
+            value = item[column] if column in item else ""
+            values.append(value if value is not None else "")
+
+        self.duplicates.append(False)
+        self._indexRow(len(self) - 1)
+        return len(self) - 1
+
+
+    def rowsForAddress(self, address):
+        """Rows whose Address is exactly address, in row order"""
+        rows = self._addressRows().get(self._addressKey(address), ())
+        return sorted(row for row in rows if self.columns["Address"][row] == address)
+
+
+    def updateItem(self, row, item):
+        #only columns present in item are changed
+        if "Address" in item:
+            self._unindexRow(row)
+
+        for column, values in self.columns.items():
+            if column in item:
+                values[row] = item[column]
+
+        if "Address" in item:
+            self._indexRow(row)
+
+
+    def setItem(self, row, item):
+        #every column is replaced, missing columns are cleared
+        self._unindexRow(row)
+
+        for column, values in self.columns.items():
+            value = item[column] if column in item else ""
+            values[row] = value if value is not None else ""
+
+        self._indexRow(row)
+
+
+    def removeRows(self, first, count):
+        for row in range(first, first + count):
+            self.dirty_addresses.add(self._addressKey(self.columns["Address"][row]))
+
+        for values in self.columns.values():
+            del values[first:first + count]
+
+        del self.duplicates[first:first + count]
+
+        #rows after the removed range moved up, renumber the multimap on next use
+        self.address_rows_stale = True
+
+
+    def checkForDuplicates(self):
+        """Update the duplicate flags of rows with a changed address, returns the rows whose flag changed"""
+        address_rows = self._addressRows()
+
+        changed_rows = []
+        for key in self.dirty_addresses:
+            rows = address_rows.get(key, ())
+
+            #virtual addresses are never duplicates
+            duplicate = len(rows) > 1 and key not in Constants.VIRTUAL_ADDRESSES
+            for row in rows:
+                if self.duplicates[row] != duplicate:
+                    self.duplicates[row] = duplicate
+                    changed_rows.append(row)
+
+        self.dirty_addresses = set()
+        return sorted(changed_rows)
+
+
+    def _addressKey(self, address):
+        return address.upper() if address is not None else ""
+
+
+    def _addressRows(self):
+        if self.address_rows_stale:
+            self.address_rows = {}
+            for row, address in enumerate(self.columns["Address"]):
+                self.address_rows.setdefault(self._addressKey(address), set()).add(row)
+
+            self.address_rows_stale = False
+
+        return self.address_rows
+
+
+    def _indexRow(self, row):
+        key = self._addressKey(self.columns["Address"][row])
+        self._addressRows().setdefault(key, set()).add(row)
+        self.dirty_addresses.add(key)
+
+
+    def _unindexRow(self, row):
+        key = self._addressKey(self.columns["Address"][row])
+        address_rows = self._addressRows()
+        rows = address_rows.get(key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del address_rows[key]
+
+        self.dirty_addresses.add(key)
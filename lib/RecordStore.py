@@ -0,0 +1,47 @@
+import lib.Constants as Constants
+
+
+#map list column names to record attribute names, the A2L source columns are only set for a fast loaded A2L
+RECORD_FIELDS = {column: column.lower().replace(" ", "_") for column in Constants.LIST_DATA_COLUMNS + Constants.SEARCH_SOURCE_COLUMNS}
+
+
+class Record():
+    """
+    Compact record for a single database row.
+    Values are read by column name, record["Name"], the same way as
+    the dictionaries used for list items.
+    """
+    __slots__ = tuple(RECORD_FIELDS.values())
+
+
+    def __init__(self, row):
+        self.name           = row["Name"]
+        self.unit           = row["Unit"]
+        self.equation       = row["Equation"]
+        self.format         = row["Format"]
+        self.address        = row["Address"]
+        self.length         = row["Length"]
+        self.signed         = row["Signed"]
+        self.progmin        = row["ProgMin"]
+        self.progmax        = row["ProgMax"]
+        self.warnmin        = row["WarnMin"]
+        self.warnmax        = row["WarnMax"]
+        self.smoothing      = row["Smoothing"]
+        self.enabled        = row["Enabled"]
+        self.tabs           = row["Tabs"]
+        self.assign_to      = row["Assign To"]
+        self.description    = row["Description"] if "Description" in row else ""
+        self.datatype       = row["DataType"] if "DataType" in row else ""
+        self.conversion     = row["Conversion"] if "Conversion" in row else ""
+
+
+    def __getitem__(self, column):
+        return getattr(self, RECORD_FIELDS[column])
+
+
+    def __contains__(self, column):
+        return column in RECORD_FIELDS
+
+
+    def toDict(self):
+        return {column: getattr(self, field) for column, field in RECORD_FIELDS.items()}
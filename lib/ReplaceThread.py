@@ -1,18 +1,20 @@
 import time
 import lib.Constants as Constants
+from lib.Database import Database
+from lib.SearchEngine import SearchEngine
 from lib.SearchThread import SearchThread
 from lib.Constants import SearchPosition
 from lib.Constants import SearchType
-from lib.Constants import DBType
 
 
 class ReplaceThread():
-    def __init__(self, logMessage, getListItem, updateListItem, finished):
+    def __init__(self, logMessage, getListItem, updateListItem, updateListItems, finished):
         super().__init__()
 
         self.logMessage         = logMessage
         self.getListItem        = getListItem
         self.updateListItem     = updateListItem
+        self.updateListItems    = updateListItems
         self.finished           = finished
 
         self.searchThread = SearchThread()
@@ -30,15 +32,8 @@ class ReplaceThread():
         self.searchItem             = None
         self.searchFound            = False
 
-        self.newDBType              = DBType.NONE
-        self.newA2LSession          = None
-        self.newCSVNameDB           = {}
-        self.newCSVAddressDB        = {}
-
-        self.originalDBType         = DBType.NONE
-        self.originalA2LSession     = None
-        self.originalCSVNameDB      = {}
-        self.originalCSVAddressDB   = {}
+        self.newDatabase            = Database()
+        self.originalDatabase       = Database()
 
 
     def run(self):
@@ -56,7 +51,61 @@ class ReplaceThread():
         self.searchItem             = None
         self.searchFound            = False
 
-        self._startNextSearch()
+        if Constants.REPLACE_BULK_RELINK:
+            self._runBulk()
+
+        else:
+            self._startNextSearch()
+
+
+    def _runBulk(self):
+        try:
+            #collect the pid list, virtual addresses are left as they are
+            rows    = []
+            row     = 0
+            item    = self.getListItem(row)
+            while item is not None and "Name" in item and "Address" in item:
+                if item["Address"].upper() not in Constants.VIRTUAL_ADDRESSES:
+                    rows.append((item, row))
+
+                row += 1
+                item = self.getListItem(row)
+
+            #resolve every address in the original database, then every name found in the new one
+            address_items   = SearchEngine(self.originalDatabase, self.logMessage).lookupAddresses(item["Address"] for item, row in rows)
+            name_items      = SearchEngine(self.newDatabase, self.logMessage).lookupNames(address_item["Name"] for address_item in address_items.values())
+
+            updates = []
+            for item, row in rows:
+                self.searchItemCount += 1
+
+                address_item = address_items.get(item["Address"])
+                if address_item is None:
+                    self.logMessage(f"Unable to find address {item["Address"]} [{item["Name"]}] in original database")
+
+                elif address_item["Name"] not in name_items:
+                    self.logMessage(f"Unable to find name {address_item["Name"]} [{item["Name"]}] in new database")
+
+                else:
+                    item["Address"] = name_items[address_item["Name"]]["Address"]
+                    updates.append((item, row))
+                    self.replaceItemCount += 1
+
+                    if len(updates) >= Constants.REPLACE_BATCH_SIZE:
+                        self.updateListItems(updates)
+                        updates = []
+
+            if updates:
+                self.updateListItems(updates)
+
+        except Exception as e:
+            self.logMessage(f"Overwrite failed: {e}")
+
+        elapsed_time = time.time() - self.searchStartTime
+        self.logMessage(f"Replaced {self.replaceItemCount} out of {self.searchItemCount} items in {elapsed_time:.2f} seconds")
+
+        self.isRunning = False
+        self.finished()
 
 
     def _startNextSearch(self):
@@ -76,17 +125,15 @@ class ReplaceThread():
             elapsed_time = time.time() - self.searchStartTime
             self.logMessage(f"Replaced {self.replaceItemCount} out of {self.searchItemCount} items in {elapsed_time:.2f} seconds")
 
+            self.isRunning = False
             self.finished()
             return
 
         #start search in original database search for address in pid list
-        self.searchThread.db_type           = self.originalDBType
-        self.searchThread.a2lsession        = self.originalA2LSession
-        self.searchThread.csv_name_db       = self.originalCSVNameDB
-        self.searchThread.csv_address_db    = self.originalCSVAddressDB
+        self.searchThread.database          = self.originalDatabase
         self.searchThread.search_string     = self.tableItem["Address"]
         self.searchThread.search_type       = SearchType.ADDR
-        self.searchThread.items_left        = 0
+        self.searchThread.items_left        = 1
         self.searchThread.start()
 
 
@@ -98,7 +145,6 @@ class ReplaceThread():
             if item is None or item["Name"] != self.searchItem["Name"]:
                 return
 
-            self.searchThread.items_left    = 0
             self.searchItem                 = item
             self.searchFound                = True
             self.tableItem["Address"]       = item["Address"]
@@ -124,11 +170,8 @@ class ReplaceThread():
 
             else:
                 #start search in new database search matching the name found in the previous database
-                self.searchThread.db_type           = self.newDBType
-                self.searchThread.a2lsession        = self.newA2LSession
-                self.searchThread.csv_name_db       = self.newCSVNameDB
-                self.searchThread.csv_address_db    = self.newCSVAddressDB
+                self.searchThread.database          = self.newDatabase
                 self.searchThread.search_string     = self.searchItem["Name"]
                 self.searchThread.search_type       = SearchType.NAME
-                self.searchThread.items_left        = 0
+                self.searchThread.items_left        = 1
                 self.searchThread.start()
\ No newline at end of file
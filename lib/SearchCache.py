@@ -0,0 +1,93 @@
+import lib.Constants as Constants
+from collections import OrderedDict
+from lib.Constants import SearchPosition
+from lib.Constants import SearchType
+
+
+class SearchCache():
+    """
+    LRU cache of complete search results for one loaded database,
+    rows are stored as tuples of the SEARCH_ROW_COLUMNS values.
+    Only results that were not truncated are stored, so a search that extends
+    a cached one, "boost" then "boostp", can be answered by filtering its rows.
+    """
+    def __init__(self, max_rows=Constants.SEARCH_CACHE_ROWS):
+        self.max_rows   = max_rows
+        self.entries    = OrderedDict()
+        self.row_count  = 0
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def get(self, search_type, search_position, search_string):
+        """Return the cached rows of this search, None when it is not cached"""
+        key = (search_type, search_position, search_string)
+        rows = self.entries.get(key)
+        if rows is not None:
+            self.entries.move_to_end(key)
+
+        return rows
+
+
+    def candidates(self, search_type, search_position, search_string):
+        """Return the smallest cached result holding every row of this search, None when there is none"""
+        #address searches are ranges, a longer address string does not narrow the results
+        if search_type == SearchType.ADDR:
+            return None
+
+        best_key = None
+        for key, rows in self.entries.items():
+            cached_type, cached_position, cached_string = key
+            if cached_type != search_type or cached_position != search_position:
+                continue
+
+            if not self._narrows(search_position, cached_string, search_string):
+                continue
+
+            if best_key is None or len(rows) < len(self.entries[best_key]):
+                best_key = key
+
+        if best_key is None:
+            return None
+
+        self.entries.move_to_end(best_key)
+        return self.entries[best_key]
+
+
+    def put(self, search_type, search_position, search_string, rows):
+        if len(rows) > self.max_rows:
+            return
+
+        key = (search_type, search_position, search_string)
+        replaced = self.entries.pop(key, None)
+        if replaced is not None:
+            self.row_count -= len(replaced)
+
+        self.entries[key] = rows
+        self.row_count += len(rows)
+
+        #evict the least recently used results
+        while self.row_count > self.max_rows:
+            key, evicted = self.entries.popitem(last=False)
+            self.row_count -= len(evicted)
+
+
+    def clear(self):
+        self.entries.clear()
+        self.row_count = 0
+
+
+    def _narrows(self, search_position, cached_string, search_string):
+        #compared as typed, case folding differs between the SQL and in memory searches
+        if search_position == SearchPosition.START:
+            return search_string.startswith(cached_string)
+
+        elif search_position == SearchPosition.CONTAIN:
+            return cached_string in search_string
+
+        elif search_position == SearchPosition.END:
+            return search_string.endswith(cached_string)
+
+        return False
@@ -0,0 +1,604 @@
+import re
+import lib.Helpers as Helpers
+import lib.Constants as Constants
+from sqlalchemy import select, and_
+from sqlalchemy.exc import OperationalError
+from pya2l import model
+from lib.AddressIndex import parseAddress, parseAddressRange
+from lib.Constants import SearchPosition
+from lib.Constants import SearchType
+from lib.Constants import DBType
+
+
+#unit, equation and format of NO_COMPU_METHOD or a CompuMethod the file does not define
+NO_COMPU_METHOD = ("", "x", "%01.0f")
+
+
+class SearchEngine():
+    """
+    Qt independent search over a loaded Database.
+    search() is a generator, result rows are only built as they are consumed,
+    so callers can stop early or process the rows in their own batches.
+    cancel() may be called from another thread to stop a search between rows.
+    """
+    def __init__(self, database, logMessage=None):
+        self.database       = database
+        self.logMessage     = logMessage if logMessage is not None else (lambda message: None)
+        self.truncated      = False
+        self.cancelled      = False
+        self.interrupted    = False
+
+
+    def cancel(self):
+        """Stop the search, a running SQL query is aborted by the progress handler"""
+        self.cancelled = True
+
+
+    def search(self, search_type, search_position, search_string, limit=Constants.MAX_SEARCH_ITEMS):
+        """Yield up to limit result rows with the SEARCH_ROW_COLUMNS keys, a limit of None returns every row"""
+        self.truncated = False
+        self.interrupted = False
+
+        if self.database.db_type == DBType.NONE:
+            self.logMessage("Search: No database loaded")
+            return
+
+        #repeated and refined searches are answered from the cached results
+        cached_rows = self.cachedRows(search_type, search_position, search_string)
+        if cached_rows is not None:
+            rows = (dict(zip(Constants.SEARCH_ROW_COLUMNS, row)) for row in cached_rows)
+
+        elif self.database.db_type == DBType.A2L:
+            rows = self._searchA2L(search_type, search_position, search_string, limit)
+
+        else:
+            rows = self._searchCSV(search_type, search_position, search_string)
+
+        #rows for the cache are only collected when they did not come from it
+        result_rows = [] if cached_rows is None else None
+        item_count = 0
+        for row in rows:
+            if self.cancelled:
+                return
+
+            #flag that more rows were available than the limit allowed
+            if limit is not None and item_count >= limit:
+                self.truncated = True
+                return
+
+            yield row
+            item_count += 1
+
+            if result_rows is not None:
+                result_rows.append(tuple(row[column] for column in Constants.SEARCH_ROW_COLUMNS))
+
+        #only complete results are cached, a refined search must not miss rows,
+        #a query aborted by cancel() ends the rows early without raising
+        if self.cancelled or self.interrupted:
+            return
+
+        if result_rows is not None:
+            self.database.search_cache.put(search_type, search_position, search_string, result_rows)
+
+
+    def cachedRows(self, search_type, search_position, search_string):
+        """Return the result rows from the search cache, filtering a cached search this one extends, or None"""
+        search_cache = self.database.search_cache
+
+        rows = search_cache.get(search_type, search_position, search_string)
+        if rows is not None:
+            return rows
+
+        candidate_rows = search_cache.candidates(search_type, search_position, search_string)
+        if candidate_rows is None:
+            return None
+
+        column = Constants.SEARCH_ROW_COLUMNS.index("Name" if search_type == SearchType.NAME else "Description")
+        matches = self.textMatcher(search_position, search_string)
+        rows = [row for row in candidate_rows if matches(row[column])]
+
+        search_cache.put(search_type, search_position, search_string, rows)
+        return rows
+
+
+    def textMatcher(self, search_position, search_string):
+        """Return a function telling whether a name or description matches, the same way the database search would"""
+        if self.database.db_type == DBType.A2L or self.database.fast_a2l:
+            if search_position == SearchPosition.EQ:
+                return lambda text: text == search_string
+
+            # SQL LIKE, % and _ are wildcards and only ASCII letters are case insensitive
+            pattern = "".join(".*" if char == "%" else "." if char == "_" else re.escape(char) for char in search_string)
+            if search_position == SearchPosition.END:
+                pattern += r"\Z"
+
+            regex = re.compile(pattern, re.ASCII | re.IGNORECASE | re.DOTALL)
+            find = regex.match if search_position == SearchPosition.START else regex.search
+            return lambda text: text is not None and find(text) is not None
+
+        search_string = search_string.lower()
+        if search_position == SearchPosition.START:
+            return lambda text: text.lower().startswith(search_string)
+
+        elif search_position == SearchPosition.CONTAIN:
+            return lambda text: search_string in text.lower()
+
+        elif search_position == SearchPosition.END:
+            return lambda text: text.lower().endswith(search_string)
+
+        return lambda text: text.lower() == search_string
+
+
+    def _searchCSV(self, search_type, search_position, search_string):
+        database = self.database
+
+        #get dictionary type
+        dict_type = None
+        dict_index = None
+        if search_type == SearchType.NAME:
+            dict_type = database.csv_name_db
+            dict_index = database.csv_name_index
+
+        elif search_type == SearchType.DESC:
+            dict_type = database.csv_desc_db
+            dict_index = database.csv_desc_index
+
+        elif search_type == SearchType.ADDR:
+            dict_type = database.csv_address_db
+            if search_position == SearchPosition.CONTAIN:
+                search_position = SearchPosition.EQ
+
+        else:
+            self.logMessage("Search: invalid search type")
+            return
+
+        if len(dict_type) == 0:
+            self.logMessage("Search: No database loaded")
+            return
+
+        if search_type == SearchType.ADDR and database.address_index is not None:
+            refs = self._searchAddressIndex(search_position, search_string)
+            if refs is None:
+                return
+
+            record_indexes = [record_index for name, record_index in refs]
+
+        elif dict_index is not None:
+            #a fast loaded A2L is searched like the built database, where % and _ are LIKE wildcards
+            if database.fast_a2l and search_position != SearchPosition.EQ and ("%" in search_string or "_" in search_string):
+                keys = dict_index.keys
+
+            elif search_position == SearchPosition.START:
+                keys = dict_index.startswith(search_string)
+
+            elif search_position == SearchPosition.CONTAIN:
+                keys = dict_index.contains(search_string)
+
+            elif search_position == SearchPosition.END:
+                keys = dict_index.endswith(search_string)
+
+            else:
+                keys = dict_index.equals(search_string)
+
+            #the index ignores case like Python, the built database only for ASCII letters and never for equals
+            if database.fast_a2l:
+                matches = self.textMatcher(search_position, search_string)
+                keys = [key for key in keys if matches(key)]
+
+            record_indexes = [dict_type[key] for key in keys]
+
+        elif search_position == SearchPosition.START:
+            record_indexes = [value for key, value in dict_type.items() if key.lower().startswith(search_string.lower())]
+
+        elif search_position == SearchPosition.CONTAIN:
+            record_indexes = [value for key, value in dict_type.items() if search_string.lower() in key.lower()]
+
+        elif search_position == SearchPosition.END:
+            record_indexes = [value for key, value in dict_type.items() if key.lower().endswith(search_string.lower())]
+
+        else:
+            record_indexes = [value for key, value in dict_type.items() if key.lower() == search_string.lower()]
+
+        #a fast loaded A2L maps a description to the list of every measurement that shares it
+        if search_type == SearchType.DESC:
+            record_indexes = [record_index for value in record_indexes for record_index in (value if isinstance(value, list) else (value,))]
+
+        #and returns the rows in name order
+        if database.fast_a2l:
+            record_indexes.sort(key=lambda record_index: database.csv_records[record_index].name)
+
+        for record_index in record_indexes:
+            yield self._recordItem(database.csv_records[record_index])
+
+
+    def _recordItem(self, item):
+        #build our result item
+        return {
+            "Name"          : item["Name"],
+            "Unit"          : item["Unit"],
+            "Equation"      : item["Equation"],
+            "Format"        : item["Format"],
+            "Address"       : item["Address"],
+            "Length"        : item["Length"],
+            "Signed"        : item["Signed"],
+            "Min"           : item["ProgMin"],
+            "Max"           : item["ProgMax"],
+            "Description"   : item["Description"],
+            "DataType"      : item["DataType"],
+            "Conversion"    : item["Conversion"]
+        }
+
+
+    def rows(self):
+        """
+        Yield every measurement of the database as a result row, without a limit and without caching.
+        Unlike a search this includes measurements without an address or a known CompuMethod
+        """
+        if self.database.db_type == DBType.A2L:
+            yield from self._streamStatement(self.allStatement())
+
+        elif self.database.db_type == DBType.CSV:
+            for record_index in self.database.csv_name_db.values():
+                yield self._recordItem(self.database.csv_records[record_index])
+
+            for record in self.database.unlisted_records:
+                yield self._recordItem(record)
+
+
+    def lookupNames(self, names):
+        """
+        Resolve many exact names at once, returns name -> result row for the names that were found.
+        An A2L is queried with one IN query per SQL_IN_CHUNK_SIZE names
+        """
+        names = list(dict.fromkeys(names))
+        results = {}
+
+        if self.database.db_type == DBType.A2L:
+            for i in range(0, len(names), Constants.SQL_IN_CHUNK_SIZE):
+                for item in self._streamA2L(model.Measurement.name.in_(names[i:i + Constants.SQL_IN_CHUNK_SIZE]), None):
+                    results.setdefault(item["Name"], item)
+
+        elif self.database.db_type == DBType.CSV:
+            for name in names:
+                record_index = self.database.csv_name_db.get(name)
+                if record_index is not None:
+                    results[name] = self._recordItem(self.database.csv_records[record_index])
+
+        return results
+
+
+    def lookupAddresses(self, addresses):
+        """
+        Resolve many exact addresses at once, returns address -> result row keyed by the given address strings.
+        Like a single address search, the first measurement by name wins where several share an address
+        """
+        #addresses are compared numerically so 0x1234 matches 0X00001234
+        keys = {}
+        for address in addresses:
+            key = parseAddress(address)
+            if key is not None:
+                keys.setdefault(key, []).append(address)
+
+        found = {}
+        if self.database.db_type == DBType.A2L:
+            values = list(keys)
+            for i in range(0, len(values), Constants.SQL_IN_CHUNK_SIZE):
+                #rows come in name order, so the first one per address is kept
+                for item in self._streamA2L(model.EcuAddress.address.in_(values[i:i + Constants.SQL_IN_CHUNK_SIZE]), None):
+                    found.setdefault(int(item["Address"], 16), item)
+
+        elif self.database.db_type == DBType.CSV and self.database.address_index is not None:
+            for key in keys:
+                refs = self.database.address_index.equals(key)
+                if refs:
+                    found[key] = self._recordItem(self.database.csv_records[min(refs)[1]])
+
+        return {address: item for key, item in found.items() for address in keys[key]}
+
+
+    def _searchA2L(self, search_type, search_position, search_string, limit):
+        a2lsession = self.database.a2lsession
+        if a2lsession is None:
+            self.logMessage("Search: No database loaded")
+            return
+
+        if search_type == SearchType.ADDR:
+            search_string = search_string.lower()
+            if parseAddressRange(search_string) is None:
+                self.logMessage(f"Search: invalid hex address - {search_string}")
+                return
+
+        elif search_type != SearchType.NAME and search_type != SearchType.DESC:
+            self.logMessage("Search: invalid search type")
+            return
+
+        self.logMessage(f"Search {self.filter_type_string(search_type)} that {self.filter_position_string(search_position)} - {search_string}")
+
+        # For address searches, use the address index built at load time
+        if search_type == SearchType.ADDR and self.database.address_index is not None:
+            refs = self._searchAddressIndex(search_position, search_string)
+            rids = [rid for name, rid in refs]
+
+            # Query measurements in chunks to stay below the SQLite parameter limit,
+            # the next chunk is only queried once the previous one has been consumed
+            for i in range(0, len(rids), Constants.SQL_IN_CHUNK_SIZE):
+                yield from self._streamA2L(self.ridFilter(rids[i:i + Constants.SQL_IN_CHUNK_SIZE]), limit)
+
+            return
+
+        yield from self._streamA2L(self.a2lFilter(search_type, search_position, search_string), limit)
+
+
+    def ridFilter(self, rids):
+        """Return the Measurement filter for one chunk of the rids an address index search found"""
+        return model.Measurement.rid.in_(rids)
+
+
+    def a2lFilter(self, search_type, search_position, search_string):
+        """Return the Measurement filter for an A2L search, None for an invalid type or address"""
+        #get filter type
+        filter_type = None
+        if search_type == SearchType.NAME:
+            if search_position == SearchPosition.START:
+                filter_type = model.Measurement.name.istartswith(search_string)
+
+            elif search_position == SearchPosition.CONTAIN:
+                filter_type = model.Measurement.name.icontains(search_string)
+
+            elif search_position == SearchPosition.END:
+                filter_type = model.Measurement.name.iendswith(search_string)
+
+            else:
+                filter_type = model.Measurement.name == search_string
+
+        elif search_type == SearchType.DESC:
+            if search_position == SearchPosition.START:
+                filter_type = model.Measurement.longIdentifier.istartswith(search_string)
+
+            elif search_position == SearchPosition.CONTAIN:
+                filter_type = model.Measurement.longIdentifier.icontains(search_string)
+
+            elif search_position == SearchPosition.END:
+                filter_type = model.Measurement.longIdentifier.iendswith(search_string)
+
+            else:
+                filter_type = model.Measurement.longIdentifier == search_string
+
+        elif search_type == SearchType.ADDR:
+            search_range = parseAddressRange(search_string.lower())
+            if search_range is None:
+                return None
+
+            # EcuAddress is joined in a2lStatement so the address can be filtered directly
+            search_long = search_range[0]
+
+            if search_range[0] != search_range[1]:
+                # Explicit range lo-hi
+                filter_type = model.EcuAddress.address.between(search_range[0], search_range[1])
+
+            elif search_position == SearchPosition.START:
+                # "Starts with" for address means >= the search address
+                filter_type = model.EcuAddress.address >= search_long
+
+            elif search_position == SearchPosition.CONTAIN or search_position == SearchPosition.EQ:
+                # "Contains" for address means exact match
+                filter_type = model.EcuAddress.address == search_long
+
+            else:
+                # "Ends with" for address means <= the search address
+                filter_type = model.EcuAddress.address <= search_long
+
+            return filter_type
+
+        else:
+            return None
+
+        # Narrow text searches through the full text index, the LIKE filter is kept so matching is unchanged
+        if self.database.text_index is not None:
+            text_filter = self.database.text_index.filter(search_type, search_position, search_string)
+            if text_filter is not None:
+                filter_type = and_(text_filter, filter_type)
+
+        return filter_type
+
+
+    def a2lStatement(self, filter_type, limit):
+        """Return the select for the result columns of the measurements matching filter_type"""
+        # Plain column tuples from one joined select, no ORM objects are built per row.
+        # The inner joins drop rows without an address or a known CompuMethod in SQL so the LIMIT
+        # counts only rows we can display, one extra row tells search() that the results were truncated
+        return (
+            select(
+                model.Measurement.name,
+                model.Measurement.conversion,
+                model.EcuAddress.address,
+                model.Measurement.datatype,
+                model.Measurement.lowerLimit,
+                model.Measurement.upperLimit,
+                model.Measurement.longIdentifier,
+            )
+                .select_from(model.Measurement)
+                .join(model.EcuAddress, model.EcuAddress._measurement_rid == model.Measurement.rid)
+                .join(model.CompuMethod, model.CompuMethod.name == model.Measurement.conversion)
+                .where(filter_type)
+                .order_by(model.Measurement.name)
+                .limit(limit + 1 if limit is not None else None)
+                .execution_options(yield_per=Constants.SQL_FETCH_SIZE)
+        )
+
+
+    def allStatement(self):
+        """Return the select for the result columns of every measurement, the address is None where it has none"""
+        #the CompuMethod and its Coeffs come from getCompuMethods, so an unknown conversion does not drop the row either
+        return (
+            select(
+                model.Measurement.name,
+                model.Measurement.conversion,
+                model.EcuAddress.address,
+                model.Measurement.datatype,
+                model.Measurement.lowerLimit,
+                model.Measurement.upperLimit,
+                model.Measurement.longIdentifier,
+            )
+                .select_from(model.Measurement)
+                .outerjoin(model.EcuAddress, model.EcuAddress._measurement_rid == model.Measurement.rid)
+                .order_by(model.Measurement.name)
+                .execution_options(yield_per=Constants.SQL_FETCH_SIZE)
+        )
+
+
+    def _streamA2L(self, filter_type, limit):
+        """Yield result rows for the measurements matching filter_type, chunk by chunk as the caller consumes them"""
+        yield from self._streamStatement(self.a2lStatement(filter_type, limit))
+
+
+    def _streamStatement(self, statement):
+        compu_methods = self.getCompuMethods()
+
+        # SQLite calls the progress handler while a query runs, a non zero return aborts it,
+        # so a cancelled search does not wait for a long LIKE scan to finish
+        a2lsession = self.database.a2lsession
+        dbapi_connection = a2lsession.connection().connection.dbapi_connection
+        dbapi_connection.set_progress_handler(lambda: self.cancelled, Constants.SQL_PROGRESS_STEPS)
+
+        try:
+            for rows in a2lsession.execute(statement).partitions():
+                # Format the limit columns of the whole chunk at once
+                min_strings = Helpers.floats_to_str(row.lowerLimit for row in rows)
+                max_strings = Helpers.floats_to_str(row.upperLimit for row in rows)
+
+                for (name, conversion, address, datatype, lower_limit, upper_limit, description), min_str, max_str in zip(rows, min_strings, max_strings):
+                    unit, equation, format_str = compu_methods.get(conversion, NO_COMPU_METHOD)
+
+                    #build our result item, a search only returns rows with an address and a known CompuMethod
+                    yield {
+                        "Name"          : name,
+                        "Unit"          : unit,
+                        "Equation"      : equation,
+                        "Format"        : format_str,
+                        "Address"       : hex(address) if address is not None else "",
+                        "Length"        : Constants.DATA_LENGTH.get(datatype, ""),
+                        "Signed"        : Constants.DATA_SIGNED.get(datatype, ""),
+                        "Min"           : min_str,
+                        "Max"           : max_str,
+                        "Description"   : description,
+                        "DataType"      : datatype,
+                        "Conversion"    : conversion
+                    }
+
+        except OperationalError:
+            if not self.cancelled:
+                raise
+
+            #the interrupted read leaves nothing to undo, the rollback only resets the session,
+            #interrupted tells search() the rows stopped short so they are not cached
+            a2lsession.rollback()
+            self.interrupted = True
+
+        finally:
+            dbapi_connection.set_progress_handler(None, 0)
+
+
+    def getCompuMethods(self):
+        """Return conversion name -> (unit, equation, format), built once per loaded database"""
+        if self.database.compu_method_cache is None:
+            rows = self.database.a2lsession.execute(
+                select(
+                    model.CompuMethod.name,
+                    model.CompuMethod.unit,
+                    model.CompuMethod.format,
+                    model.Coeffs.a,
+                    model.Coeffs.b,
+                    model.Coeffs.c,
+                    model.Coeffs.d,
+                    model.Coeffs.e,
+                    model.Coeffs.f,
+                )
+                    .outerjoin(model.Coeffs, model.Coeffs._compu_method_rid == model.CompuMethod.rid)
+            )
+            self.database.compu_method_cache = {
+                name: (unit, self.getEquationFromCoeffs(coeffs), self.getFormat(compu_format)) for name, unit, compu_format, *coeffs in rows
+            }
+
+        return self.database.compu_method_cache
+
+
+    def _searchAddressIndex(self, search_position, search_string):
+        search_range = parseAddressRange(search_string)
+        if search_range is None:
+            self.logMessage(f"Search: invalid hex address - {search_string}")
+            return None
+
+        lo, hi = search_range
+        if lo != hi:
+            refs = self.database.address_index.between(lo, hi)
+
+        elif search_position == SearchPosition.START:
+            # "Starts with" for address means >= the search address
+            refs = self.database.address_index.atLeast(lo)
+
+        elif search_position == SearchPosition.END:
+            # "Ends with" for address means <= the search address
+            refs = self.database.address_index.atMost(lo)
+
+        else:
+            refs = self.database.address_index.equals(lo)
+
+        # refs are (name, row) pairs, return them in name order
+        return sorted(refs)
+
+
+    def getEquationFromCoeffs(self, coeffs):
+        #coeffs are the a-f values, all None when the CompuMethod has no COEFFS
+        if all(coeff is None for coeff in coeffs):
+            return "x"
+
+        a, b, c, d, e, f = Helpers.floats_to_str(coeffs)
+
+        sign = '-'
+        if c[0] == '-':
+            c = c[1:]
+            sign = '+'
+
+        operation = f"(({f} * [x]) {sign} {c}) / {b}"
+
+        if a == "0.0" and d == "0.0" and e=="0.0" and f!="0.0":
+            return operation
+        else:
+            return "x"
+
+
+    def getFormat(self, compu_format):
+        #build format string
+        try:
+            format_precision = int(compu_format.split(".")[-1].lstrip().rstrip())
+
+            if format_precision > Constants.FORMAT_PRECISION_LIMIT:
+                format_precision = Constants.FORMAT_PRECISION_LIMIT
+
+            return f"%01.{format_precision}f"
+
+        except:
+            return "%01.0f"
+
+
+    def filter_position_string(self, search_position):
+        if search_position == SearchPosition.START:
+            return "starts with"
+
+        elif search_position == SearchPosition.CONTAIN:
+            return "contains"
+
+        else:
+            return "ends with"
+
+
+    def filter_type_string(self, search_type):
+        if search_type == SearchType.NAME:
+            return "name"
+
+        elif search_type == SearchType.DESC:
+            return "description"
+
+        else:
+            return "address"
@@ -0,0 +1,121 @@
+from array import array
+from bisect import bisect_left
+
+
+TRIGRAM_LENGTH  = 3
+MAX_CHARACTER   = chr(0x10FFFF)
+
+
+class TextIndex():
+    """
+    Case-insensitive index over the keys of a CSV database dictionary.
+    Keys are lower-cased once at load time and every trigram is mapped to
+    a posting list of key ids, so substring searches only need to verify
+    the few keys that contain all trigrams of the search string.
+    Sorted arrays of the lower-cased keys and of the reversed keys turn
+    starts with, ends with and equals into bisect range scans.
+    All searches return keys in name order.
+    """
+    def __init__(self, keys):
+        self.keys       = list(keys)
+        self.lower_keys = [key.lower() for key in self.keys]
+        self.trigrams   = {}
+
+        postings = {}
+        for key_id, key in enumerate(self.lower_keys):
+            for trigram in self._trigrams(key):
+                posting = postings.get(trigram)
+                if posting is None:
+                    postings[trigram] = [key_id]
+
+                else:
+                    posting.append(key_id)
+
+        #store posting lists as compact integer arrays
+        for trigram, posting in postings.items():
+            self.trigrams[trigram] = array("l", posting)
+
+        #sorted keys for prefix and equality lookups
+        order               = sorted(range(len(self.lower_keys)), key=self.lower_keys.__getitem__)
+        self.sorted_keys    = [self.lower_keys[key_id] for key_id in order]
+        self.sorted_ids     = array("l", order)
+
+        #position of every key in name order
+        self.rank = array("l", bytes(self.sorted_ids.itemsize * len(order)))
+        for position, key_id in enumerate(order):
+            self.rank[key_id] = position
+
+        #sorted reversed keys for suffix lookups
+        reversed_keys       = [key[::-1] for key in self.lower_keys]
+        order               = sorted(range(len(reversed_keys)), key=reversed_keys.__getitem__)
+        self.reversed_keys  = [reversed_keys[key_id] for key_id in order]
+        self.reversed_ids   = array("l", order)
+
+
+    def __len__(self):
+        return len(self.keys)
+
+
+    def contains(self, search_string):
+        """Return keys containing search_string"""
+        search_string = search_string.lower()
+
+        #too short to use trigrams, scan the pre-lowered keys
+        if len(search_string) < TRIGRAM_LENGTH:
+            return self._keysInOrder(key_id for key_id, key in enumerate(self.lower_keys) if search_string in key)
+
+        #intersect posting lists starting with the smallest
+        postings = []
+        for trigram in self._trigrams(search_string):
+            posting = self.trigrams.get(trigram)
+            if posting is None:
+                return []
+
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        #verify the remaining candidates
+        return self._keysInOrder(key_id for key_id in candidates if search_string in self.lower_keys[key_id])
+
+
+    def startswith(self, search_string):
+        """Return keys starting with search_string"""
+        lo, hi = self._prefixRange(self.sorted_keys, search_string.lower())
+        return [self.keys[key_id] for key_id in self.sorted_ids[lo:hi]]
+
+
+    def endswith(self, search_string):
+        """Return keys ending with search_string"""
+        lo, hi = self._prefixRange(self.reversed_keys, search_string.lower()[::-1])
+        return self._keysInOrder(self.reversed_ids[lo:hi])
+
+
+    def equals(self, search_string):
+        """Return keys equal to search_string"""
+        search_string = search_string.lower()
+        lo = bisect_left(self.sorted_keys, search_string)
+        hi = lo
+        while hi < len(self.sorted_keys) and self.sorted_keys[hi] == search_string:
+            hi += 1
+
+        return [self.keys[key_id] for key_id in self.sorted_ids[lo:hi]]
+
+
+    def _prefixRange(self, sorted_keys, prefix):
+        lo = bisect_left(sorted_keys, prefix)
+        hi = bisect_left(sorted_keys, prefix + MAX_CHARACTER, lo)
+        return lo, hi
+
+
+    def _keysInOrder(self, key_ids):
+        return [self.keys[key_id] for key_id in sorted(key_ids, key=self.rank.__getitem__)]
+
+
+    def _trigrams(self, key):
+        return {key[i:i + TRIGRAM_LENGTH] for i in range(len(key) - TRIGRAM_LENGTH + 1)}
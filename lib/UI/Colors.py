@@ -0,0 +1,6 @@
+from PyQt6.QtGui import QColor
+
+
+#list of colors used by the UI, kept out of Constants so it can be imported without Qt
+
+DUPLICATE_BACKGROUND_COLOR      = QColor(120, 24, 24)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import lib.Constants as Constants
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QListWidget, QTabWidget
+from lib.Database import Database
+from lib.UI.TABDatabase import TABDatabase
+from lib.UI.TABSearch import TABSearch
+from lib.UI.TABList import TABList
+from lib.Constants import DBType
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, db_file=None, csv_file=None):
+        super().__init__()
+
+        #Variable used to hold database
+        self.database       = Database()
+
+        # Store CSV file to load after A2L is loaded
+        self.pending_csv_file = csv_file 
+
+        #set title
+        self.setWindowTitle(Constants.APPLICATION_VERSION_STRING)
+
+        #tabs
+        self.listTab = TABList(self)
+        self.dbTab = TABDatabase(self)
+        self.searchTab = TABSearch(self)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.dbTab, "Database")
+        self.tabs.addTab(self.searchTab, "Search")
+        self.tabs.addTab(self.listTab, "List")
+
+        #log box
+        self.listViewLog = QListWidget()
+        self.listViewLog.setFixedHeight(100)
+        layoutLog = QVBoxLayout()
+        layoutLog.addWidget(self.listViewLog)
+
+        layoutBoxAll = QVBoxLayout()
+        layoutBoxAll.addWidget(self.tabs)
+        layoutBoxAll.addLayout(layoutLog)
+
+        widget = QWidget()
+        widget.setLayout(layoutBoxAll)
+        self.setGeometry(300, 300, 650, 600)
+        self.setCentralWidget(widget)
+        self.show()
+
+        # If db_file was provided, load it automatically
+        if db_file:
+            self.dbTab.fileEditBox.setText(db_file)
+            self.dbTab.LoadButtonClick()
+        elif csv_file:
+            # If only CSV provided without DB, load it immediately
+            self.listTab.ImportButtonClick(csvFilename=csv_file)
+            # Switch to List tab to show the imported data
+            self.tabs.setCurrentIndex(2)
+
+
+    def addLogEntry(self, entry):
+        self.listViewLog.addItem(entry)
+        self.listViewLog.scrollToBottom()
+
+
+    def addListItem(self, item, overwrite=False):
+        self.listTab.addListItem(item, overwrite)
+
+
+    def getListItem(self, row):
+        return self.listTab.getListItem(row)
+
+
+    def updateListItem(self, item, row):
+        self.listTab.updateListItem(item, row)
+
+
+    def updateListItems(self, items):
+        self.listTab.updateListItems(items)
+
+
+    def stopSearch(self):
+        self.searchTab.stopSearch()
+
+
+    def checkForDuplicates(self):
+        self.listTab.checkForDuplicates()
+
+
+    def checkAndLoadPendingCSV(self):
+        """Check if DB is loaded and load pending CSV if present"""
+        if self.pending_csv_file and self.database.db_type != DBType.NONE:
+            # Use TABList's ImportButtonClick method with the filename
+            self.listTab.ImportButtonClick(csvFilename=self.pending_csv_file)
+            # Switch to List tab to show the imported data
+            self.tabs.setCurrentIndex(2)
+            self.pending_csv_file = None  # Clear after loading
\ No newline at end of file
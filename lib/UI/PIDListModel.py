@@ -0,0 +1,158 @@
+import lib.Constants as Constants
+import lib.UI.Colors as Colors
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from lib.PIDList import PIDList
+
+
+class PIDListModel(QAbstractTableModel):
+    """
+    Table model over a PIDList store, the view only asks for the cells it paints
+    so no Qt object is created per cell.
+    """
+    def __init__(self, pid_list=None):
+        super().__init__()
+
+        self.pid_list = pid_list if pid_list is not None else PIDList()
+
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.pid_list)
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(Constants.LIST_DATA_COLUMNS)
+
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.EditRole:
+            return self.pid_list.value(index.row(), Constants.LIST_DATA_COLUMNS[index.column()])
+
+        if role == Qt.ItemDataRole.BackgroundRole and self.pid_list.duplicates[index.row()]:
+            return Colors.DUPLICATE_BACKGROUND_COLOR
+
+        return None
+
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+
+        self.pid_list.setValue(index.row(), Constants.LIST_DATA_COLUMNS[index.column()], str(value))
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
+
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if orientation == Qt.Orientation.Horizontal:
+            return Constants.LIST_DATA_COLUMNS[section]
+
+        return str(section + 1)
+
+
+    def appendItems(self, items):
+        if not items:
+            return
+
+        first = len(self.pid_list)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        for item in items:
+            self.pid_list.appendItem(item)
+
+        self.endInsertRows()
+
+
+    def setItem(self, row, item):
+        self.pid_list.setItem(row, item)
+        self._rowsChanged([row])
+
+
+    def importItems(self, items, overwrite=False):
+        """
+        Add items as one model update. With overwrite, rows with the same Address are
+        replaced instead, including rows appended earlier in the same import.
+        """
+        if not overwrite:
+            self.appendItems(items)
+            return
+
+        changed_rows = set()
+        new_items = []
+        new_items_by_address = {}
+        for item in items:
+            address = item.get("Address", "")
+            existing_rows = self.pid_list.rowsForAddress(address)
+            if existing_rows:
+                for row in existing_rows:
+                    self.pid_list.setItem(row, item)
+
+                changed_rows.update(existing_rows)
+
+            elif address in new_items_by_address:
+                for index in new_items_by_address[address]:
+                    new_items[index] = item
+
+            else:
+                new_items_by_address[address] = [len(new_items)]
+                new_items.append(item)
+
+        self._rowsChanged(changed_rows)
+        self.appendItems(new_items)
+
+
+    def updateItems(self, items):
+        #items is a list of (item, row) pairs
+        rows = []
+        for item, row in items:
+            if 0 <= row < len(self.pid_list):
+                self.pid_list.updateItem(row, item)
+                rows.append(row)
+
+        self._rowsChanged(rows)
+
+
+    def removeItems(self, rows):
+        #remove contiguous ranges from the bottom up so earlier row numbers stay valid
+        rows = sorted(set(rows), reverse=True)
+        index = 0
+        while index < len(rows):
+            last = first = rows[index]
+            index += 1
+            while index < len(rows) and rows[index] == first - 1:
+                first = rows[index]
+                index += 1
+
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self.pid_list.removeRows(first, last - first + 1)
+            self.endRemoveRows()
+
+
+    def checkForDuplicates(self):
+        #only rows whose duplicate flag flipped are recoloured
+        self._rowsChanged(self.pid_list.checkForDuplicates(), [Qt.ItemDataRole.BackgroundRole])
+
+
+    def _rowsChanged(self, rows, roles=None):
+        #one signal per contiguous run of changed rows
+        rows = sorted(set(rows))
+        index = 0
+        while index < len(rows):
+            first = last = rows[index]
+            index += 1
+            while index < len(rows) and rows[index] == last + 1:
+                last = rows[index]
+                index += 1
+
+            self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1), roles if roles is not None else [])
@@ -0,0 +1,113 @@
+import lib.Constants as Constants
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """
+    Table model over the search results, rows are kept as plain tuples and only
+    handed to the view in FETCH_SIZE chunks as it scrolls (canFetchMore/fetchMore).
+    """
+    FETCH_SIZE = 256
+
+    def __init__(self):
+        super().__init__()
+
+        self.rows           = []
+        self.loaded         = 0
+        self.sort_column    = None
+        self.sort_order     = Qt.SortOrder.AscendingOrder
+
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(Constants.SEARCH_DATA_COLUMNS)
+
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        return self.rows[index.row()][index.column()]
+
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        if orientation == Qt.Orientation.Horizontal:
+            return Constants.SEARCH_DATA_COLUMNS[section]
+
+        return str(section + 1)
+
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+
+        count = min(self.FETCH_SIZE, len(self.rows) - self.loaded)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+
+    def fetchAll(self):
+        """Hand every stored row to the view at once"""
+        if self.loaded < len(self.rows):
+            self.beginInsertRows(QModelIndex(), self.loaded, len(self.rows) - 1)
+            self.loaded = len(self.rows)
+            self.endInsertRows()
+
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        #column -1 means unsorted, rows stay in the order the search returned them
+        if column < 0 or column >= len(Constants.SEARCH_DATA_COLUMNS):
+            self.sort_column = None
+            return
+
+        self.sort_column    = column
+        self.sort_order     = order
+
+        self.layoutAboutToBeChanged.emit()
+        self.rows.sort(key=lambda row: row[column], reverse=(order == Qt.SortOrder.DescendingOrder))
+        self.layoutChanged.emit()
+
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows   = []
+        self.loaded = 0
+        self.endResetModel()
+
+
+    def appendItems(self, items):
+        # Store the rows in the expected column order from Constants
+        # This ensures columns match even if dict key order changes during signal emission
+        for item in items:
+            self.rows.append(tuple(item.get(column_name, "") for column_name in Constants.SEARCH_DATA_COLUMNS))
+
+        #the view only asks for more rows when scrolled, so fill the first page here
+        if self.loaded < self.FETCH_SIZE:
+            self.fetchMore()
+
+
+    def applySort(self):
+        """Sort all stored rows once by the last requested column"""
+        if self.sort_column is not None:
+            self.sort(self.sort_column, self.sort_order)
+
+
+    def getItem(self, row):
+        if row < 0 or row >= len(self.rows):
+            return None
+
+        return dict(zip(Constants.SEARCH_DATA_COLUMNS, self.rows[row]))
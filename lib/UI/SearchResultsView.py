@@ -0,0 +1,12 @@
+from PyQt6.QtWidgets import QTableView
+
+
+class SearchResultsView(QTableView):
+    """
+    Table view over a SearchResultsModel.
+    Select all, from Ctrl+A or the corner button, first fetches every result into
+    the view, so rows the user has not scrolled to yet are part of the selection.
+    """
+    def selectAll(self):
+        self.model().fetchAll()
+        super().selectAll()
@@ -13,7 +13,7 @@ class TABDatabase(QWidget):
         self.loadThread.logMessage.connect(self.parent.addLogEntry)
         self.loadThread.finished.connect(self.onFinishedLoading)
 
-        self.replaceThread = ReplaceThread(self.parent.addLogEntry, self.parent.getListItem, self.parent.updateListItem, self._replaceFinished)
+        self.replaceThread = ReplaceThread(self.parent.addLogEntry, self.parent.getListItem, self.parent.updateListItem, self.parent.updateListItems, self._replaceFinished)
 
         #Main layout box
         self.mainLayoutBox = QVBoxLayout()
@@ -69,16 +69,11 @@ class TABDatabase(QWidget):
     def onFinishedLoading(self):
         #overwrite list pid addresses
         if self.overwriteCheckBox.isChecked():
-            self.replaceThread.newDBType              = self.loadThread.db_type
-            self.replaceThread.newA2LSession          = self.loadThread.a2lsession
-            self.replaceThread.newCSVNameDB           = self.loadThread.csv_name_db
-            self.replaceThread.newCSVAddressDB        = self.loadThread.csv_address_db
-
-            self.replaceThread.originalDBType         = self.parent.db_type
-            self.replaceThread.originalA2LSession     = self.parent.a2lsession
-            self.replaceThread.originalCSVNameDB      = self.parent.csv_name_db
-            self.replaceThread.originalCSVAddressDB   = self.parent.csv_address_db
+            self.replaceThread.newDatabase            = self.loadThread.database
+            self.replaceThread.originalDatabase       = self.parent.database
 
+            #the relink queries the current database, which a search may still be using
+            self.parent.stopSearch()
             self.replaceThread.run()
 
         else:
@@ -86,24 +81,22 @@ class TABDatabase(QWidget):
 
 
     def _checkOverwrite(self):
-        self.overwriteCheckBox.setEnabled(True if self.parent.db_type != DBType.NONE else False)
+        self.overwriteCheckBox.setEnabled(True if self.parent.database.db_type != DBType.NONE else False)
 
 
     def _loadDatabase(self):
-        self.parent.a2ldb           = self.loadThread.a2ldb
-        self.parent.a2lsession      = self.loadThread.a2lsession
-        self.parent.csv_name_db     = self.loadThread.csv_name_db
-        self.parent.csv_desc_db     = self.loadThread.csv_desc_db
-        self.parent.csv_address_db  = self.loadThread.csv_address_db
+        #drop the caches built for the previous database before switching
+        if self.parent.database is not self.loadThread.database:
+            self.parent.database.invalidateCaches()
 
-        self.parent.db_type = self.loadThread.db_type
+        self.parent.database = self.loadThread.database
 
         #update layout
         self.loadPushButton.setEnabled(True)
         self._checkOverwrite()
 
         # Switch to Search tab if file loaded successfully
-        if self.parent.db_type != DBType.NONE:
+        if self.parent.database.db_type != DBType.NONE:
             self.parent.tabs.setTabEnabled(1, True)
             self.parent.tabs.setTabEnabled(2, True)
             self.parent.tabs.setCurrentIndex(1)
@@ -1,6 +1,9 @@
 import csv
 import lib.Constants as Constants
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QTableWidget, QTableWidgetItem, QAbstractItemView, QCheckBox
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QTableView, QAbstractItemView, QCheckBox
+from lib.UI.PIDListModel import PIDListModel
+from lib.ListRefresh import ListRefresh
+from lib.Constants import DBType
 
 
 class TABList(QWidget):
@@ -24,6 +27,11 @@ class TABList(QWidget):
         self.exportPushButton.pressed.connect(self.ExportButtonClick)
         self.buttonsLayoutBox.addWidget(self.exportPushButton)
 
+        self.refreshPushButton = QPushButton("Refresh from database")
+        self.refreshPushButton.setFixedHeight(50)
+        self.refreshPushButton.pressed.connect(self.RefreshButtonClick)
+        self.buttonsLayoutBox.addWidget(self.refreshPushButton)
+
         self.mainLayoutBox.addLayout(self.buttonsLayoutBox)
 
         #Overwrite checkbox
@@ -31,11 +39,11 @@ class TABList(QWidget):
         self.overwriteCheckBox.setChecked(False)
         self.mainLayoutBox.addWidget(self.overwriteCheckBox)
 
-        #Items table
-        self.itemsTable = QTableWidget()
+        #Items table, rows are held in the model's columnar store
+        self.itemsModel = PIDListModel()
+        self.itemsTable = QTableView()
+        self.itemsTable.setModel(self.itemsModel)
         self.itemsTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.itemsTable.setColumnCount(len(Constants.LIST_DATA_COLUMNS))
-        self.itemsTable.setHorizontalHeaderLabels(Constants.LIST_DATA_COLUMNS)
         for i in range(len(Constants.LIST_COLUMN_SIZES)):
             self.itemsTable.setColumnWidth(i, Constants.LIST_COLUMN_SIZES[i])
 
@@ -57,57 +65,28 @@ class TABList(QWidget):
                 self.parent.addLogEntry(f"Failed to add item to list: {item}")
                 return
 
-        # Check if item with same Address already exists
-        existing_rows = []
-        if overwrite:
-            item_address = item.get("Address", "")
-            address_col = Constants.LIST_DATA_COLUMNS.index("Address")
-            for row in range(self.itemsTable.rowCount()):
-                cell = self.itemsTable.item(row, address_col)
-                if cell is not None and cell.text() == item_address:
-                    existing_rows.append(row)
-        
-        # If overwrite mode and item exists, update all matching rows; otherwise add new row
-        if existing_rows:
-            # Update all existing rows with matching Address
-            for target_row in existing_rows:
-                for column_index in range(self.itemsTable.columnCount()):
-                    column_str = Constants.LIST_DATA_COLUMNS[column_index]
-                    entryItem = QTableWidgetItem(item[column_str] if column_str in item else "")
-                    self.itemsTable.setItem(target_row, column_index, entryItem)
-
-        else:
-            # Add new row
-            self.itemsTable.setRowCount(self.itemsTable.rowCount() + 1)
-            target_row = self.itemsTable.rowCount() - 1
-            for column_index in range(self.itemsTable.columnCount()):
-                column_str = Constants.LIST_DATA_COLUMNS[column_index]
-                entryItem = QTableWidgetItem(item[column_str] if column_str in item else "")
-                self.itemsTable.setItem(target_row, column_index, entryItem)
+        # Update all rows with a matching Address when overwriting, otherwise add a new row
+        self.itemsModel.importItems([item], overwrite)
 
 
-    def getListItem(self, row):
-        if row in range(self.itemsTable.rowCount()):
-            item = {}
-            for column_index in range(self.itemsTable.columnCount()):
-                table_item = self.itemsTable.item(row, column_index)
-                column_str = Constants.LIST_DATA_COLUMNS[column_index]
-                item[column_str] = table_item.text() if table_item is not None else ""
+    def rowCount(self):
+        return self.itemsModel.rowCount()
 
-            return item
 
-        return None
+    def getListItem(self, row):
+        return self.itemsModel.pid_list.getItem(row)
 
 
     def updateListItem(self, item, row):
         if item is None:
             return
 
-        if row in range(self.itemsTable.rowCount()):
-            for column_index in range(self.itemsTable.columnCount()):
-                column_str = Constants.LIST_DATA_COLUMNS[column_index]
-                if column_str in item:
-                    self.itemsTable.item(row, column_index).setText(item[column_str])
+        self.itemsModel.updateItems([(item, row)])
+
+
+    def updateListItems(self, items):
+        #items is a list of (item, row) pairs, repaint once for the whole batch
+        self.itemsModel.updateItems(items)
 
 
     def ImportButtonClick(self, csvFilename=None):
@@ -136,8 +115,8 @@ class TABList(QWidget):
                         self.parent.addLogEntry(f"Import failed: {csvFilename[0]} does not contain {column_str}")
                         return
 
-                for row in csvreader:
-                    self.addListItem(row, overwrite)
+                # The whole file is applied as a single model update
+                self.itemsModel.importItems(list(csvreader), overwrite)
 
                 self.checkForDuplicates()
 
@@ -156,27 +135,36 @@ class TABList(QWidget):
             with open(csvFilename[0], "w", encoding="latin-1", newline='') as csvfile:
                 csvwriter = csv.DictWriter(csvfile, fieldnames=Constants.LIST_DATA_COLUMNS)
 
-                data = []
-                for row in range(self.itemsTable.rowCount()):
-                    dataEntry = {}
-                    for column_index in range(self.itemsTable.columnCount()):
-                        cell = self.itemsTable.item(row, column_index)
-                        column_str = Constants.LIST_DATA_COLUMNS[column_index]
-                        dataEntry[column_str] = cell.text() if cell is not None else ""
-
-                    data.append(dataEntry)
-
                 csvwriter.writeheader()
-                csvwriter.writerows(data)
+                csvwriter.writerows(self.itemsModel.pid_list.items())
                 self.parent.addLogEntry(f"Export successful: {csvFilename[0]}")
 
         except Exception as e:
             self.parent.addLogEntry(f"Export failed: {csvFilename[0]} - {e}")
 
 
+    def RefreshButtonClick(self):
+        if self.parent.database.db_type == DBType.NONE:
+            self.parent.addLogEntry("Refresh failed: no database loaded")
+            return
+
+        #the refresh runs on this thread against the session a search may be using
+        self.parent.stopSearch()
+
+        try:
+            list_refresh = ListRefresh(self.parent.database, self.parent.addLogEntry)
+            updates = list_refresh.refresh([(self.getListItem(row), row) for row in range(self.rowCount())])
+
+            # Only the changed columns are written, repainted as one batch
+            self.itemsModel.updateItems(updates)
+            self.parent.addLogEntry(list_refresh.summary())
+
+        except Exception as e:
+            self.parent.addLogEntry(f"Refresh failed: {e}")
+
+
     def RemoveButtonClick(self):
-        while len(self.itemsTable.selectedItems()):
-            self.itemsTable.removeRow(self.itemsTable.selectedItems()[0].row())
+        self.itemsModel.removeItems([index.row() for index in self.itemsTable.selectionModel().selectedRows()])
 
         self.checkForDuplicates()
 
@@ -187,40 +175,7 @@ class TABList(QWidget):
             return
 
         try:
-            #get address index
-            address_index = Constants.LIST_DATA_COLUMNS.index("Address")
-
-            #reset all rows to normal color
-            for row in range(self.itemsTable.rowCount()):
-                self._setRowColor(row, Constants.NORMAL_BACKGROUND_COLOR)
-
-            for row in range(self.itemsTable.rowCount()):
-                #if the row is already highlighted continue
-                if self.itemsTable.item(row, 0).background() == Constants.DUPLICATE_BACKGROUND_COLOR:
-                    continue
-
-                #get address and see if its a virtual address, if so move on
-                address = self.itemsTable.item(row, address_index).text().upper()
-                if address in Constants.VIRTUAL_ADDRESSES:
-                    self._setRowColor(row, Constants.NORMAL_BACKGROUND_COLOR)
-                    continue
-
-                #now compare address to all rows except its own
-                isDuplicate = False
-                for compareRow in range(row + 1, self.itemsTable.rowCount()):
-                    compareAddress = self.itemsTable.item(compareRow, address_index).text().upper()
-                    if compareAddress == address:
-                        isDuplicate = True
-                        self._setRowColor(compareRow, Constants.DUPLICATE_BACKGROUND_COLOR)
-
-                #did we find a duplicate?
-                if isDuplicate:
-                    self._setRowColor(row, Constants.DUPLICATE_BACKGROUND_COLOR)
+            self.itemsModel.checkForDuplicates()
 
         except Exception as e:
-            self.parent.addLogEntry(f"Check for duplicates failed: {e}")
-
-
-    def _setRowColor(self, row, color):
-        for column_index in range(self.itemsTable.columnCount()):
-            self.itemsTable.item(row, column_index).setBackground(color)
\ No newline at end of file
+            self.parent.addLogEntry(f"Check for duplicates failed: {e}")
\ No newline at end of file
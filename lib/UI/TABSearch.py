@@ -1,9 +1,14 @@
 import lib.Helpers as Helpers
 import lib.Constants as Constants
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QRadioButton, QLineEdit, QLabel, QTableWidget, QTableWidgetItem, QAbstractItemView, QButtonGroup, QCheckBox, QGridLayout
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QRadioButton, QLineEdit, QLabel, QAbstractItemView, QButtonGroup, QCheckBox, QGridLayout
+from PyQt6.QtCore import Qt, QTimer
 from lib.SearchThread import SearchThread
+from lib.UI.SearchResultsModel import SearchResultsModel
+from lib.UI.SearchResultsView import SearchResultsView
+from lib.AddressIndex import parseAddressRange
 from lib.Constants import SearchPosition
 from lib.Constants import SearchType
+from lib.Constants import DBType
 
 
 class TABSearch(QWidget):
@@ -11,11 +16,14 @@ class TABSearch(QWidget):
         super().__init__(parent)
         self.parent         = parent
 
-        #Search thread
-        self.searchThread   = SearchThread()
-        self.searchThread.addItemsBatch.connect(self.addItemsBatch)                     # Connect the new batch signal for better performance
-        self.searchThread.logMessage.connect(self.parent.addLogEntry)
-        self.searchThread.finished.connect(self.onFinishedSearch)
+        #Search thread, a new one for every search
+        self.searchThread   = self._createSearchThread()
+
+        #Search as you type, started once typing pauses
+        self.searchTimer    = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(Constants.SEARCH_DEBOUNCE_MS)
+        self.searchTimer.timeout.connect(self.startTypedSearch)
         
         #Main layout box
         self.mainLayoutBox = QVBoxLayout()
@@ -28,7 +36,8 @@ class TABSearch(QWidget):
 
         self.inputEditBox = QLineEdit()
         self.inputEditBox.setFixedHeight(30)
-        self.inputEditBox.returnPressed.connect(self.SearchButtonClick)
+        self.inputEditBox.returnPressed.connect(self.startSearch)
+        self.inputEditBox.textChanged.connect(self.onSearchTextChanged)
         self.searchLayoutBox.addWidget(self.inputEditBox)
         
         self.mainLayoutBox.addLayout(self.searchLayoutBox)
@@ -77,11 +86,13 @@ class TABSearch(QWidget):
         self.searchPushButton.pressed.connect(self.SearchButtonClick)
         self.mainLayoutBox.addWidget(self.searchPushButton)
 
-        #Items table
-        self.itemsTable = QTableWidget()
+        #Items table, results are only materialised as the view scrolls
+        self.itemsModel = SearchResultsModel()
+        self.itemsTable = SearchResultsView()
+        self.itemsTable.setModel(self.itemsModel)
         self.itemsTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.itemsTable.setColumnCount(len(Constants.SEARCH_DATA_COLUMNS))
-        self.itemsTable.setHorizontalHeaderLabels(Constants.SEARCH_DATA_COLUMNS)
+        self.itemsTable.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.itemsTable.setSortingEnabled(True)
         for i in range(len(Constants.SEARCH_COLUMN_SIZES)):
             self.itemsTable.setColumnWidth(i, Constants.SEARCH_COLUMN_SIZES[i])
 
@@ -103,90 +114,115 @@ class TABSearch(QWidget):
 
     def SearchButtonClick(self):
         if self.searchThread.isRunning():
-            self.searchThread.terminate()
+            self.cancelSearch()
             self.parent.addLogEntry("Cancelled")
             self.searchPushButton.setText("Start")
 
         else:
-            self.itemsTable.setRowCount(0)
-            self.searchPushButton.setText("Cancel")
-
-            #set search position
-            if self.startRadioButton.isChecked():
-                self.searchThread.search_position   = SearchPosition.START
+            self.startSearch()
 
-            elif self.containRadioButton.isChecked():
-                self.searchThread.search_position   = SearchPosition.CONTAIN
 
-            elif self.endRadioButton.isChecked():
-                self.searchThread.search_position   = SearchPosition.END
+    def onSearchTextChanged(self, text):
+        #every key press restarts the timer, so only the text typed before a pause is searched
+        if Constants.SEARCH_AS_YOU_TYPE and text and self.parent.database.db_type != DBType.NONE:
+            #a partly typed address is not searched, it would only log an invalid address
+            if self.addressRadioButton.isChecked() and parseAddressRange(text) is None:
+                self.searchTimer.stop()
 
             else:
-                self.searchThread.search_position   = SearchPosition.EQ
+                self.searchTimer.start()
 
-            #set search type
-            if self.nameRadioButton.isChecked():
-                self.searchThread.search_type   = SearchType.NAME
+        else:
+            self.searchTimer.stop()
 
-            elif self.descriptionRadioButton.isChecked():
-                self.searchThread.search_type   = SearchType.DESC
 
-            else:
-                self.searchThread.search_type   = SearchType.ADDR
+    def startTypedSearch(self):
+        #typing starts a search on every pause, only the explicitly started ones are logged
+        self.startSearch(quiet=True)
+
+
+    def startSearch(self, quiet=False):
+        self.searchTimer.stop()
+
+        #a running search is stopped first, both would share the database session
+        if self.searchThread.isRunning():
+            self.cancelSearch()
+
+        self.searchThread = self._createSearchThread()
+        self.itemsModel.clear()
+        self.searchPushButton.setText("Cancel")
+
+        #set search position
+        if self.startRadioButton.isChecked():
+            self.searchThread.search_position   = SearchPosition.START
+
+        elif self.containRadioButton.isChecked():
+            self.searchThread.search_position   = SearchPosition.CONTAIN
+
+        elif self.endRadioButton.isChecked():
+            self.searchThread.search_position   = SearchPosition.END
+
+        else:
+            self.searchThread.search_position   = SearchPosition.EQ
+
+        #set search type
+        if self.nameRadioButton.isChecked():
+            self.searchThread.search_type   = SearchType.NAME
+
+        elif self.descriptionRadioButton.isChecked():
+            self.searchThread.search_type   = SearchType.DESC
+
+        else:
+            self.searchThread.search_type   = SearchType.ADDR
+
+        self.searchThread.database          = self.parent.database
+        self.searchThread.items_left        = Constants.MAX_SEARCH_ITEMS
+        self.searchThread.search_string     = self.inputEditBox.text()
+        self.searchThread.quiet             = quiet
+        self.searchThread.start()
 
-            self.searchThread.db_type           = self.parent.db_type
-            self.searchThread.a2lsession        = self.parent.a2lsession
-            self.searchThread.csv_name_db       = self.parent.csv_name_db
-            self.searchThread.csv_desc_db       = self.parent.csv_desc_db
-            self.searchThread.csv_address_db    = self.parent.csv_address_db
-            self.searchThread.items_left        = Constants.MAX_SEARCH_ITEMS
-            self.searchThread.search_string     = self.inputEditBox.text()
-            self.searchThread.start()
+
+    def cancelSearch(self):
+        #the engine aborts its query within a few milliseconds, so waiting does not block the UI for long
+        self.searchThread.cancel()
+        self.searchThread.wait()
+
+
+    def stopSearch(self):
+        #called before another task queries the database session, a pending or running search must not overlap it
+        self.searchTimer.stop()
+        if self.searchThread.isRunning():
+            self.cancelSearch()
+            self.parent.addLogEntry("Cancelled")
+            self.searchPushButton.setText("Start")
+
+
+    def _createSearchThread(self):
+        searchThread = SearchThread()
+        searchThread.addItemsBatch.connect(self.addItemsBatch)                      # Connect the new batch signal for better performance
+        searchThread.logMessage.connect(self.parent.addLogEntry)
+        searchThread.finished.connect(self.onFinishedSearch)
+        return searchThread
 
 
     def AddButtonClick(self):
         overwrite = self.overwriteCheckBox.isChecked()
         selected_rows = set()
-        for item in self.itemsTable.selectedItems():
-            selected_rows.add(item.row())
+        for index in self.itemsTable.selectionModel().selectedRows():
+            selected_rows.add(index.row())
 
         for row in sorted(selected_rows):
-            # Get cell values safely, handling None cells
-            name_item       = self.itemsTable.item(row, 0)
-            unit_item       = self.itemsTable.item(row, 1)
-            equation_item   = self.itemsTable.item(row, 2)
-            format_item     = self.itemsTable.item(row, 3)
-            address_item    = self.itemsTable.item(row, 4)
-            length_item     = self.itemsTable.item(row, 5)
-            signed_item     = self.itemsTable.item(row, 6)
-            min_item        = self.itemsTable.item(row, 7)
-            max_item        = self.itemsTable.item(row, 8)
-            desc_item       = self.itemsTable.item(row, 9)
+            item = self.itemsModel.getItem(row)
 
             # Skip row if essential fields are missing
-            if not all([name_item, address_item, length_item, signed_item, min_item, max_item]):
+            if item is None or not all([item["Name"], item["Address"], item["Length"], item["Signed"], item["Min"], item["Max"]]):
                 self.parent.addLogEntry(f"Skipped row {row + 1}: missing required fields")
                 continue
 
-            item = {
-                "Name"          : name_item.text(),
-                "Unit"          : unit_item.text() if unit_item else "",
-                "Equation"      : equation_item.text() if equation_item else "",
-                "Format"        : format_item.text() if format_item else "%01.0f",
-                "Address"       : address_item.text(),
-                "Length"        : length_item.text(),
-                "Signed"        : signed_item.text(),
-                "ProgMin"       : min_item.text(),
-                "ProgMax"       : max_item.text(),
-                "WarnMin"       : Helpers.float_to_str(float(min_item.text()) - 1),
-                "WarnMax"       : Helpers.float_to_str(float(max_item.text()) + 1),
-                "Smoothing"     : "0",
-                "Enabled"       : "TRUE",
-                "Tabs"          : "",
-                "Assign To"     : "",
-                "Description"   : desc_item.text() if desc_item else ""
-            }
-            self.parent.addListItem(item, overwrite)
+            if not item["Format"]:
+                item["Format"] = "%01.0f"
+
+            self.parent.addListItem(Helpers.search_to_list_item(item), overwrite)
 
         self.parent.checkForDuplicates()
 
@@ -194,40 +230,25 @@ class TABSearch(QWidget):
 
 
     def onFinishedSearch(self):
+        #a search replaced by a newer one finishes after the new one started
+        if self.sender() is not self.searchThread:
+            return
+
         self.searchPushButton.setText("Start")
 
+        #sort once now all results are in, rather than on every batch
+        self.itemsModel.applySort()
+
 
     def addItemEntry(self, item):
         #self.parent.addLogEntry(f"Item: {item}")
-        self.itemsTable.setRowCount(self.itemsTable.rowCount() + 1)
-
-        for index, (key, value) in enumerate(item.items()):
-            entryItem = QTableWidgetItem(value)
-            self.itemsTable.setItem(self.itemsTable.rowCount() - 1, index, entryItem)
+        self.itemsModel.appendItems([item])
 
 
     def addItemsBatch(self, items):
-        """Add multiple items to the table at once for better performance"""
-        if not items:
+        """Add multiple items to the results model at once for better performance"""
+        #drop batches a replaced search queued before it was cancelled
+        if not items or self.sender() is not self.searchThread:
             return
-        
-        # Disable sorting during batch insert for better performance
-        self.itemsTable.setSortingEnabled(False)
-        
-        # Get current row count and set new row count all at once
-        current_rows = self.itemsTable.rowCount()
-        new_row_count = current_rows + len(items)
-        self.itemsTable.setRowCount(new_row_count)
-        
-        # Add all items using the expected column order from Constants
-        # This ensures columns match even if dict key order changes during signal emission
-        for batch_index, item in enumerate(items):
-            row = current_rows + batch_index
-            for col_index, column_name in enumerate(Constants.SEARCH_DATA_COLUMNS):
-                value = item.get(column_name, "")
-                entryItem = QTableWidgetItem(value)
-                self.itemsTable.setItem(row, col_index, entryItem)
-        
-        # Re-enable sorting after batch insert
-        self.itemsTable.setSortingEnabled(True)
-            
\ No newline at end of file
+
+        self.itemsModel.appendItems(items)